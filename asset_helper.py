@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# asset_helper.py
+# Page images (backgrounds, favicon) loaded, downscaled, re-encoded and base64'd once per process
+# instead of on every Streamlit rerun. Backgrounds become WebP (PNG if Pillow lacks WebP), which
+# cuts the inline CSS from ~110 KB / ~500 KB to a few KB; the 1024 px favicon is served at 128 px.
+# Cache keys include the file's mtime, so replacing an asset takes effect without a restart.
+# Static mode (server.enableStaticServing, see .streamlit/config.toml): the optimized files are
+# written once to static/gen/<name>.<content hash>.<ext> and pages reference "app/static/gen/..."
+# instead of embedding base64, so browsers cache them across reruns and visits. The hashed names
+# never change content, so a proxy / CDN in front may serve app/static/gen/* as immutable.
+# KUNDALI_ASSET_MODE = auto (default: static when serving is enabled) / static / inline.
+
+import base64, hashlib, io, os, tempfile
+
+import streamlit as st
+from PIL import Image
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+BG_MAX_PX = 1600
+BG_QUALITY = 82
+ICON_PX = 128
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+STATIC_SUBDIR = "gen"
+ASSET_MODE = os.getenv("KUNDALI_ASSET_MODE", "auto")
+_EXT = {"image/webp": "webp", "image/png": "png"}
+
+
+def asset_path(name):
+    return name if os.path.isabs(name) else os.path.join(ASSETS_DIR, os.path.basename(name))
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def static_serving_enabled():
+    if ASSET_MODE in ("static", "inline"):
+        return ASSET_MODE == "static"
+    try:
+        return bool(st.get_option("server.enableStaticServing"))
+    except Exception:
+        return False
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _optimized(path, mtime, max_px, quality, fmt="WEBP"):
+    im = Image.open(path)
+    im.load()
+    has_alpha = im.mode in ("RGBA", "LA", "PA") or (im.mode == "P" and "transparency" in im.info)
+    if has_alpha and im.convert("RGBA").getextrema()[3][0] == 255:
+        has_alpha = False          # alpha channel present but fully opaque
+    im = im.convert("RGBA" if has_alpha else "RGB")
+    im.thumbnail((max_px, max_px), Image.LANCZOS)
+    buf = io.BytesIO()
+    try:
+        if fmt != "WEBP":
+            raise ValueError(fmt)
+        im.save(buf, "WEBP", quality=quality, method=6)
+        mime = "image/webp"
+    except Exception:
+        buf = io.BytesIO(); im.save(buf, "PNG", optimize=True)
+        mime = "image/png"
+    return buf.getvalue(), mime
+
+def optimized_image(name, max_px=BG_MAX_PX, quality=BG_QUALITY):
+    """(bytes, mime) of the re-encoded asset, or None if it is missing / unreadable."""
+    path = asset_path(name)
+    mtime = _mtime(path)
+    if mtime is None:
+        return None
+    try:
+        return _optimized(path, mtime, max_px, quality)
+    except Exception:
+        return None
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _data_url(path, mtime, max_px, quality, fmt="WEBP"):
+    data, mime = _optimized(path, mtime, max_px, quality, fmt)
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+def image_data_url(name, max_px=BG_MAX_PX, quality=BG_QUALITY):
+    """data: URL of the optimized asset ("" if missing)."""
+    path = asset_path(name)
+    mtime = _mtime(path)
+    if mtime is None:
+        return ""
+    try:
+        return _data_url(path, mtime, max_px, quality)
+    except Exception:
+        return ""
+
+
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _published(path, mtime, max_px, quality, fmt="WEBP"):
+    """Write the optimized file under STATIC_DIR once; its app-relative URL."""
+    data, mime = _optimized(path, mtime, max_px, quality, fmt)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    fname = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}.{_EXT[mime]}"
+    out_dir = os.path.join(STATIC_DIR, STATIC_SUBDIR)
+    dest = os.path.join(out_dir, fname)
+    if not os.path.exists(dest):
+        os.makedirs(out_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, dest)
+    return f"app/static/{STATIC_SUBDIR}/{fname}"
+
+def _url(path, mtime, max_px, quality, static, fmt="WEBP"):
+    if static:
+        try:
+            return _published(path, mtime, max_px, quality, fmt)
+        except Exception:
+            pass   # read-only checkout etc.: fall back to inline
+    return _data_url(path, mtime, max_px, quality, fmt)
+
+def image_url(name, max_px=BG_MAX_PX, quality=BG_QUALITY):
+    """Hashed app/static URL in static mode, else the data: URL ("" if the asset is missing)."""
+    path = asset_path(name)
+    mtime = _mtime(path)
+    if mtime is None:
+        return ""
+    try:
+        return _url(path, mtime, max_px, quality, static_serving_enabled())
+    except Exception:
+        return ""
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _background_css(path, mtime, static, size, position, attachment, fallback_color, transparent_header):
+    url = _url(path, mtime, BG_MAX_PX, BG_QUALITY, static)
+    rules = [f'background-image: url("{url}");', f"background-size: {size};",
+             f"background-position: {position};", "background-repeat: no-repeat;"]
+    if attachment:
+        rules.append(f"background-attachment: {attachment};")
+    if fallback_color:
+        rules.append(f"background-color: {fallback_color};")
+    css = '[data-testid="stAppViewContainer"] {\n  ' + "\n  ".join(rules) + "\n}"
+    if transparent_header:
+        css += '\n[data-testid="stHeader"] { background: transparent; }'
+    return f"<style>\n{css}\n</style>"
+
+def background_css(name, size="cover", position="center", attachment=None, fallback_color=None,
+                   transparent_header=False):
+    """<style> block putting the asset behind the app view ("" if the asset is missing)."""
+    path = asset_path(name)
+    mtime = _mtime(path)
+    if mtime is None:
+        return ""
+    try:
+        return _background_css(path, mtime, static_serving_enabled(), size, position, attachment,
+                               fallback_color, transparent_header)
+    except Exception:
+        return ""
+
+
+@st.cache_resource(show_spinner=False)
+def _icon(path, mtime, px):
+    im = Image.open(path)
+    im.thumbnail((px, px), Image.LANCZOS)
+    im.load()
+    return im
+
+def page_icon(name="fevicon_icon.png", fallback="🪔", px=ICON_PX):
+    """st.set_page_config(page_icon=...) value: hashed app/static PNG URL in static mode, else a
+    downscaled PIL image; the fallback emoji if the asset is missing."""
+    path = asset_path(name)
+    mtime = _mtime(path)
+    if mtime is None:
+        return fallback
+    try:
+        if static_serving_enabled():
+            try:
+                return _published(path, mtime, px, BG_QUALITY, "PNG")
+            except Exception:
+                pass
+        return _icon(path, mtime, px)
+    except Exception:
+        return fallback
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# bench_report_formats.py
+# DOCX vs native PDF writer, both from one KundaliReport (chart computed once).
+# python bench_report_formats.py [repeats]   (PDF needs fpdf2 + a Devanagari font, see kundali_pdf_lib)
+
+import datetime, sys, time
+
+from kundali_report_lib import build_report
+from kundali_docx_lib import build_kundali_docx
+from kundali_pdf_lib import render_kundali_pdf, pdf_available
+from timezone_helper import local_to_utc
+
+
+def _time(fn, repeats):
+    fn()   # warm caches (template master, chart geometry, fonts)
+    best, total = float("inf"), 0.0
+    for _ in range(repeats):
+        t = time.perf_counter(); out = fn(); dt = time.perf_counter() - t
+        best = min(best, dt); total += dt
+    return best, total / repeats, len(out)
+
+
+def main(repeats=20):
+    dt_local = datetime.datetime(1990, 5, 17, 10, 30)
+    tz_hours, dt_utc = local_to_utc("Asia/Kolkata", dt_local)
+    t = time.perf_counter()
+    report = build_report("Test Person", "Mumbai, Maharashtra, India", dt_local, dt_utc, 19.0760, 72.8777,
+                          "Asia/Kolkata", tz_hours)
+    print(f"report  {1000 * (time.perf_counter() - t):8.2f} ms (chart + tables, shared by both writers)")
+    writers = [("docx", lambda: build_kundali_docx(report))]
+    if pdf_available():
+        writers.append(("pdf", lambda: render_kundali_pdf(report).getvalue()))
+    else:
+        print("pdf     skipped (fpdf2 or Devanagari font not found)")
+    for label, fn in writers:
+        best, mean, size = _time(fn, repeats)
+        print(f"{label:<7} {1000 * best:8.2f} ms best {1000 * mean:8.2f} ms mean {size / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
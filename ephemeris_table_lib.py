@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+# ephemeris_table_lib.py
+# Optional precomputed sidereal ephemeris for date-range scans (transits, muhurta search, bulk jobs).
+# Longitude and speed of the eight Swiss Ephemeris bodies (Ke = Ra + 180) are sampled every step_days
+# into a .npy file that is memory-mapped on load; a lookup is a cubic Hermite interpolation
+# between the two bracketing samples (position + speed at both ends), vectorised over instants.
+# The Moshier series behind swe.calc_ut has isolated glitches: over about a day the speed swings
+# (e.g. Saturn near 270 deg around JD 2480413), which daily samples miss by up to ~13" (Saturn),
+# ~8" (Jupiter), ~3.6" (Mars), ~2.7" (Mercury), ~2" (Venus). The builder therefore checks every
+# interval every PATCH_PROBE_DAYS against calc_ut and stores PATCH_SUB sub-samples for the ones
+# that miss by more than PATCH_TOL_ARCSEC (118 intervals for 1800-2100 at daily steps, 0.5 MB).
+# Max error of that table on a 0.1-day scan of 1800-2100 (`check`, offset from the builder's
+# probes): Moon 0.63", Mercury 0.64", Mars 0.64", Jupiter 0.65", Saturn 0.69", Venus 0.57", Sun and
+# nodes < 0.01"; inside the patched intervals < 0.15". A longitude error e moves a boundary crossing
+# found from the table by e / speed: for 0.7" ~1.3 s of the Moon's mean motion and ~8 min of
+# Saturn's, more near a station where the speed goes to zero.
+# ~14.5 MB for 1800-2100; ~80x faster than per-instant calc_ut for hourly scans. Natal charts keep
+# calling Swiss Ephemeris directly.
+# Build offline with the bundled ephemeris (no data files needed):
+#   python ephemeris_table_lib.py build 1800 2100 [--step 1]
+#   python ephemeris_table_lib.py check [--step 0.1]    (~5 min each for 1800-2100)
+
+import argparse, json, os, threading
+
+import numpy as np
+import swisseph as swe
+
+from kundali_engine_lib import PLANETS, SWE_BODIES, set_sidereal_locked, sidereal_positions, jd_from_datetimes
+
+EPHEMERIS_TABLE_PATH = os.getenv(
+    "KUNDALI_EPHEMERIS_TABLE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "ephemeris_1d.npy"))
+TABLE_VERSION = 2
+PATCH_PROBE_DAYS = 0.1     # builder checks every interval this densely against calc_ut
+PATCH_TOL_ARCSEC = 0.7     # intervals that miss by more are sub-sampled (daily Moon rows reach ~0.65")
+PATCH_SUB = 32             # sub-samples per patched interval
+
+
+def _meta_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+def _patch_path(path):
+    return os.path.splitext(path)[0] + "_patches.npz"
+
+def _hermite(a, b, u, step):
+    """Cubic Hermite longitude between rows a and b (..., 8, 2) at fraction u of step (unwrapped)."""
+    p0 = a[..., 0]
+    d = (b[..., 0] - p0 + 180.0) % 360.0 - 180.0   # shortest way across 0/360
+    u2 = u * u; u3 = u2 * u
+    return p0 + d * (3 * u2 - 2 * u3) + step * (a[..., 1] * (u3 - 2 * u2 + u) + b[..., 1] * (u3 - u2))
+
+
+class EphemerisTable:
+    """data[i, b] = (sidereal longitude, speed deg/day) of SWE_BODIES[b] at jd0 + i * step.
+    patch[k, s] is the same at jd0 + (patch_idx[k] + s / patch_sub) * step, for the intervals the
+    builder found the daily rows can't follow."""
+
+    def __init__(self, path=EPHEMERIS_TABLE_PATH):
+        with open(_meta_path(path), encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != TABLE_VERSION or meta.get("sid_mode") != swe.SIDM_LAHIRI:
+            raise ValueError(f"incompatible ephemeris table {path}")
+        self.data = np.load(path, mmap_mode="r")
+        self.jd0, self.step = float(meta["jd0"]), float(meta["step_days"])
+        self.jd1 = self.jd0 + (len(self.data) - 1) * self.step
+        self.patch_sub = int(meta["patch_sub"])
+        with np.load(_patch_path(path)) as z:
+            self.patch_idx, self.patch = z["idx"], z["data"]
+
+    def covers(self, jds):
+        jds = np.asarray(jds, dtype=float)
+        return bool(np.all((jds >= self.jd0) & (jds <= self.jd1)))
+
+    def lons_at_jd(self, jds):
+        """(M, 9) sidereal longitudes in PLANETS order for an array of Julian days (UT)."""
+        x = (np.atleast_1d(np.asarray(jds, dtype=float)) - self.jd0) / self.step
+        i = np.clip(np.floor(x).astype(np.intp), 0, len(self.data) - 2)
+        u = (x - i)[:, None]
+        lon = _hermite(self.data[i], self.data[i + 1], u, self.step)   # touches only the bracketing rows
+        if len(self.patch_idx):
+            k = np.minimum(np.searchsorted(self.patch_idx, i), len(self.patch_idx) - 1)
+            hit = np.flatnonzero(self.patch_idx[k] == i)
+            if len(hit):
+                k = k[hit]; xs = u[hit, 0] * self.patch_sub
+                j = np.clip(np.floor(xs).astype(np.intp), 0, self.patch_sub - 1)
+                lon[hit] = _hermite(self.patch[k, j], self.patch[k, j + 1], (xs - j)[:, None],
+                                    self.step / self.patch_sub)
+        out = np.empty((len(x), 9))
+        out[:, :8] = lon % 360.0
+        out[:, 8] = (out[:, 7] + 180.0) % 360.0
+        return out
+
+    def lons_at(self, datetimes):
+        """lons_at_jd() for naive UTC datetimes."""
+        return self.lons_at_jd(jd_from_datetimes(datetimes))
+
+    def positions(self, dt_utc):
+        """{code: lon} like sidereal_positions()[2], for one naive UTC datetime."""
+        return dict(zip(PLANETS, self.lons_at([dt_utc])[0].tolist()))
+
+
+_table = None
+_table_lock = threading.Lock()
+
+def get_ephemeris_table():
+    """Shared table, memory-mapped on first use; None if it hasn't been built."""
+    global _table
+    with _table_lock:
+        if _table is None:
+            try:
+                _table = EphemerisTable()
+            except Exception:
+                _table = False
+        return _table or None
+
+def sidereal_lons(datetimes):
+    """(M, 9) sidereal longitudes for naive UTC datetimes: from the table when it covers them all,
+    else straight from Swiss Ephemeris."""
+    table = get_ephemeris_table()
+    jds = jd_from_datetimes(datetimes)
+    if table is not None and table.covers(jds):
+        return table.lons_at_jd(jds)
+    return np.array([[sidereal_positions(dt)[2][c] for c in PLANETS] for dt in datetimes]).reshape(-1, 9)
+
+
+# ---- Offline builder ----
+def _calc(jds, speed=True):
+    """(M, 8, 2) sidereal (longitude, speed) rows from swe.calc_ut; speed is left 0 when not asked."""
+    set_sidereal_locked()
+    flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL | (swe.FLG_SPEED if speed else 0)
+    calc_ut = swe.calc_ut
+    out = np.zeros((len(jds), 8, 2))
+    for k, jd in enumerate(np.asarray(jds, dtype=float).tolist()):
+        row = out[k]
+        for b, body in enumerate(SWE_BODIES):
+            xx, _ = calc_ut(jd, body, flags); row[b, 0] = xx[0] % 360.0; row[b, 1] = xx[3]
+    return out
+
+def _arcsec(est, ref):
+    return np.abs((est - ref + 180.0) % 360.0 - 180.0) * 3600.0
+
+def build_ephemeris_table(start_year=1800, end_year=2100, step_days=1.0, path=EPHEMERIS_TABLE_PATH,
+                          probe_days=PATCH_PROBE_DAYS, tol_arcsec=PATCH_TOL_ARCSEC, sub=PATCH_SUB):
+    """Sample [1 Jan start_year, 1 Jan end_year + 1] and write path (+ .json metadata and the patch
+    file). Every interval is then checked every probe_days; where the interpolation misses calc_ut
+    by more than tol_arcsec (the Moshier glitches, see header) it gets `sub` sub-samples.
+    Returns (rows, patched intervals)."""
+    jd0 = swe.julday(start_year, 1, 1, 0.0)
+    n = int(np.ceil((swe.julday(end_year + 1, 1, 1, 0.0) - jd0) / step_days)) + 1
+    data = _calc(jd0 + np.arange(n) * step_days)
+    m = max(2, int(np.ceil(step_days / probe_days)))
+    err = np.zeros(n - 1)
+    for u in (np.arange(1, m) / m).tolist():
+        ref = _calc(jd0 + (np.arange(n - 1) + u) * step_days, speed=False)[..., 0]
+        est = _hermite(data[:-1], data[1:], u, step_days)
+        err = np.maximum(err, _arcsec(est, ref).max(axis=1))
+    idx = np.flatnonzero(err > tol_arcsec)
+    patch = _calc((jd0 + (idx[:, None] + np.arange(sub + 1) / sub) * step_days).ravel()).reshape(len(idx), sub + 1, 8, 2)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp.npy"
+    np.save(tmp, data); os.replace(tmp, path)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, idx=idx, data=patch); os.replace(tmp, _patch_path(path))
+    with open(_meta_path(path), "w", encoding="utf-8") as f:
+        json.dump({"version": TABLE_VERSION, "sid_mode": swe.SIDM_LAHIRI, "jd0": jd0, "step_days": step_days,
+                   "start_year": start_year, "end_year": end_year, "bodies": PLANETS[:8],
+                   "patch_sub": sub, "patch_tol_arcsec": tol_arcsec}, f)
+    return n, len(idx)
+
+def max_error_arcsec(table, scan_days=0.1, chunk=50000):
+    """{code: max |table - sidereal_positions|} in arc seconds over a grid every scan_days across the
+    table's range, offset by half a step so it falls between the builder's probes."""
+    jds = np.arange(table.jd0 + 0.5 * scan_days, table.jd1, scan_days)
+    err = np.zeros(8)
+    for lo in range(0, len(jds), chunk):
+        part = jds[lo:lo + chunk]
+        err = np.maximum(err, _arcsec(table.lons_at_jd(part)[:, :8], _calc(part, speed=False)[..., 0]).max(axis=0))
+    return dict(zip(PLANETS, err.tolist()))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build or check the precomputed sidereal ephemeris table.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("start_year", type=int, nargs="?", default=1800)
+    b.add_argument("end_year", type=int, nargs="?", default=2100)
+    b.add_argument("--step", type=float, default=1.0, help="days between samples")
+    b.add_argument("--out", default=EPHEMERIS_TABLE_PATH)
+    c = sub.add_parser("check")
+    c.add_argument("--path", default=EPHEMERIS_TABLE_PATH)
+    c.add_argument("--step", type=float, default=0.1, help="days between checked instants")
+    args = ap.parse_args()
+    if args.cmd == "build":
+        rows, patched = build_ephemeris_table(args.start_year, args.end_year, args.step, args.out)
+        print(rows, "rows,", patched, "patched intervals written to", args.out)
+    else:
+        for code, e in max_error_arcsec(EphemerisTable(args.path), args.step).items():
+            print(f"{code}  {e:.3f}\"")
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+# gazetteer_helper.py
+# Offline place lookup from the bundled assets/gazetteer.tsv.gz (GeoNames extract, CC BY 4.0):
+# every Indian town with population >= 1000 plus world cities >= 100k.
+# Names (and, for large Indian cities, old names such as Bombay / Calcutta) are kept in one sorted array, so
+# exact and prefix lookups are a bisect. lookup_place() only answers when the name matches exactly and
+# every qualifier (state / country) is one it knows and agrees with; anything else is a miss, so the
+# caller falls back to Geoapify instead of taking a same-named city elsewhere. A difflib pass over the
+# prefix range catches typos, but only for the suggestion list.
+
+import bisect, difflib, gzip, os, re, threading, unicodedata
+from typing import NamedTuple
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "gazetteer.tsv.gz")
+FUZZY_CUTOFF = 0.85
+
+PLACE_NOT_FOUND = "Place not found."
+
+# Common alternative spellings of qualifiers users type after the city name
+_ADMIN_ALIASES = {
+    'orissa': 'odisha', 'pondicherry': 'puducherry', 'uttaranchal': 'uttarakhand',
+    'nct': 'delhi', 'nct of delhi': 'delhi', 'new delhi': 'delhi', 'j and k': 'jammu and kashmir',
+    'jk': 'jammu and kashmir', 'up': 'uttar pradesh', 'mp': 'madhya pradesh', 'ap': 'andhra pradesh',
+    'tn': 'tamil nadu', 'wb': 'west bengal',
+}
+_COUNTRY_ALIASES = {
+    'bharat': 'in', 'hindustan': 'in', 'usa': 'us', 'united states of america': 'us', 'america': 'us',
+    'uk': 'gb', 'england': 'gb', 'great britain': 'gb', 'britain': 'gb', 'uae': 'ae',
+}
+
+
+class Place(NamedTuple):
+    name: str
+    admin1: str
+    country: str
+    cc: str
+    lat: float
+    lon: float
+    population: int
+    timezone: str
+
+    @property
+    def formatted(self):
+        return ", ".join(p for p in (self.name, self.admin1, self.country) if p)
+
+
+def _norm(s):
+    s = unicodedata.normalize("NFKD", s or "")
+    s = "".join(ch for ch in s if not unicodedata.combining(ch)).casefold()
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", s.replace("&", " and ")).split())
+
+
+class Gazetteer:
+    def __init__(self, path=GAZETTEER_PATH):
+        self.places = []
+        pairs = []
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                name, alts, admin1, country, cc, lat, lon, pop, tz = line.rstrip("\n").split("\t")
+                i = len(self.places)
+                self.places.append(Place(name, admin1, country, cc, float(lat), float(lon), int(pop or 0), tz))
+                for key in {_norm(name), *(_norm(a) for a in alts.split("|") if a)}:
+                    if key:
+                        pairs.append((key, i))
+        pairs.sort()
+        self._keys = [k for k, _ in pairs]
+        self._ids = [i for _, i in pairs]
+        self._admins = {_norm(p.admin1) for p in self.places if p.admin1}
+        self._countries = {_norm(p.country): p.cc.lower() for p in self.places}
+        self._countries.update((p.cc.lower(), p.cc.lower()) for p in self.places)
+
+    # ---- index primitives ----
+    def _exact(self, key):
+        lo = bisect.bisect_left(self._keys, key); hi = bisect.bisect_right(self._keys, key)
+        ids = [self._ids[j] for j in range(lo, hi)]
+        # a place actually called "New Delhi" beats a bigger one that lists it as an old name
+        primary = [i for i in ids if _norm(self.places[i].name) == key]
+        return primary or ids
+
+    def _prefix_range(self, prefix):
+        lo = bisect.bisect_left(self._keys, prefix)
+        hi = bisect.bisect_left(self._keys, prefix + "\uffff")
+        return lo, hi
+
+    def _fuzzy(self, key):
+        lo, hi = self._prefix_range(key[:2])
+        best, out = 0.0, []
+        sm = difflib.SequenceMatcher(b=key, autojunk=False)
+        for j in range(lo, hi):
+            sm.set_seq1(self._keys[j])
+            if sm.real_quick_ratio() < FUZZY_CUTOFF or sm.quick_ratio() < FUZZY_CUTOFF:
+                continue
+            r = sm.ratio()
+            if r > best + 1e-9: best, out = r, [self._ids[j]]
+            elif abs(r - best) <= 1e-9: out.append(self._ids[j])
+        return out if best >= FUZZY_CUTOFF else []
+
+    def _quals_ok(self, p, quals, strict=True):
+        # Qualifiers we recognise (state or country) must agree. Unknown ones (districts, counties,
+        # "BC", "London") can't be checked here: a miss when strict, ignored for suggestions.
+        for q in quals:
+            q = _ADMIN_ALIASES.get(q, q)
+            cc = _COUNTRY_ALIASES.get(q) or self._countries.get(q)
+            if cc:
+                if cc != p.cc.lower(): return False
+            elif q in self._admins:
+                if q != _norm(p.admin1): return False
+            elif strict:
+                return False
+        return True
+
+    # ---- public API ----
+    def lookup_place(self, place):
+        """Place for an exact name match whose qualifiers all check out, else None."""
+        parts = [k for k in (_norm(p) for p in (place or "").split(",")) if k]
+        if not parts:
+            return None
+        city, quals = parts[0], parts[1:]
+        cands = [self.places[i] for i in set(self._exact(city))]
+        cands = [p for p in cands if self._quals_ok(p, quals)]
+        if cands:
+            return max(cands, key=lambda p: p.population)
+        return None
+
+    def lookup(self, place):
+        """Same contract as geocode_helper.geocode(): (lat, lon, formatted) or RuntimeError."""
+        p = self.lookup_place(place)
+        if p is None:
+            raise RuntimeError(PLACE_NOT_FOUND)
+        return p.lat, p.lon, p.formatted
+
+    def suggest(self, text, limit=5):
+        """Most populous places whose name starts with the text before the first comma, then close
+        (typo) matches; unrecognised qualifiers are ignored here."""
+        parts = [k for k in (_norm(p) for p in (text or "").split(",")) if k]
+        if not parts:
+            return []
+        lo, hi = self._prefix_range(parts[0])
+        seen = {i for i in self._ids[lo:hi]}
+        cands = [self.places[i] for i in seen if self._quals_ok(self.places[i], parts[1:], strict=False)]
+        cands.sort(key=lambda p: -p.population)
+        if len(cands) < limit:
+            fuzzy = [self.places[i] for i in set(self._fuzzy(parts[0])) - seen]
+            fuzzy = [p for p in fuzzy if self._quals_ok(p, parts[1:], strict=False)]
+            cands += sorted(fuzzy, key=lambda p: -p.population)
+        return cands[:limit]
+
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer():
+    """Shared Gazetteer, loaded on first use; None if the data file is missing or unreadable."""
+    global _gazetteer
+    with _gazetteer_lock:
+        if _gazetteer is None:
+            try:
+                _gazetteer = Gazetteer()
+            except Exception:
+                _gazetteer = False
+        return _gazetteer or None
+
+
+# ---- Offline builder (not used at runtime) ----
+# python gazetteer_helper.py <geonamescache cities1000.json> <geonamescache countries.json> <rg_cities1000.csv>
+IN_ADMIN1 = {
+    '01': 'Andaman and Nicobar Islands', '02': 'Andhra Pradesh', '03': 'Assam', '05': 'Chandigarh',
+    '07': 'Delhi', '09': 'Gujarat', '10': 'Haryana', '11': 'Himachal Pradesh', '12': 'Jammu and Kashmir',
+    '13': 'Kerala', '14': 'Lakshadweep', '16': 'Maharashtra', '17': 'Manipur', '18': 'Meghalaya',
+    '19': 'Karnataka', '20': 'Nagaland', '21': 'Odisha', '22': 'Puducherry', '23': 'Punjab',
+    '24': 'Rajasthan', '25': 'Tamil Nadu', '26': 'Tripura', '28': 'West Bengal', '29': 'Sikkim',
+    '30': 'Arunachal Pradesh', '31': 'Mizoram', '33': 'Goa', '34': 'Bihar', '35': 'Madhya Pradesh',
+    '36': 'Uttar Pradesh', '37': 'Chhattisgarh', '38': 'Jharkhand', '39': 'Uttarakhand', '40': 'Telangana',
+    '41': 'Ladakh', '52': 'Dadra and Nagar Haveli and Daman and Diu',
+}
+
+def build_gazetteer(cities_json, countries_json, rg_csv, out_path=GAZETTEER_PATH, min_pop_world=100000, alt_min_pop=100000):
+    import csv, json
+    countries = {c['iso']: c['name'] for c in json.load(open(countries_json, encoding='utf-8')).values()}
+    rg_admin = {}
+    with open(rg_csv, encoding='utf-8') as f:
+        for r in csv.DictReader(f):
+            rg_admin[(r['name'], round(float(r['lat']), 2), round(float(r['lon']), 2))] = r['admin1']
+    rows = []
+    for c in json.load(open(cities_json, encoding='utf-8')).values():
+        cc = c['countrycode']
+        if cc != 'IN' and c['population'] < min_pop_world:
+            continue
+        if cc == 'IN':
+            admin1 = IN_ADMIN1.get(c['admin1code'], '')
+        else:
+            admin1 = rg_admin.get((c['name'], round(c['latitude'], 2), round(c['longitude'], 2)), '')
+        alts = []
+        if cc == 'IN' and c['population'] >= alt_min_pop:
+            # Capitalised Latin-script alternates only (Bombay, Calcutta, Gurgaon, ...);
+            # skip airport codes and the long tail of foreign transliterations
+            alts = sorted({a for a in c.get('alternatenames', [])
+                           if re.fullmatch(r"[A-Z][A-Za-z .]+", a) and not a.isupper()
+                           and _norm(a) != _norm(c['name'])})
+        rows.append((c['name'], "|".join(alts), admin1, countries.get(cc, cc), cc,
+                     f"{c['latitude']:.5f}", f"{c['longitude']:.5f}", str(c['population']), c['timezone']))
+    rows.sort(key=lambda r: (-int(r[7]), r[0]))
+    with gzip.open(out_path, "wt", encoding="utf-8", compresslevel=9) as f:
+        for r in rows:
+            f.write("\t".join(r) + "\n")
+    return len(rows)
+
+
+if __name__ == "__main__":
+    import sys
+    print(build_gazetteer(*sys.argv[1:4]), "places written to", GAZETTEER_PATH)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# geocode_helper.py
+# Geoapify place lookup plus a two-tier cache (in-process LRU + SQLite on disk).
+# Keys are normalised place strings; positive results live for GEOCODE_TTL_S,
+# "Place not found." answers for GEOCODE_NEG_TTL_S. Network errors are never cached.
+
+import json, os, sqlite3, threading, time, unicodedata, urllib.parse, urllib.request
+from collections import OrderedDict
+
+from gazetteer_helper import get_gazetteer
+
+GEOCODE_DB_PATH   = os.getenv(
+    "GEOCODE_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "geocode.sqlite3"))
+GEOCODE_LRU_SIZE  = 2048
+GEOCODE_TTL_S     = 90 * 24 * 3600   # places don't move; keep a quarter
+GEOCODE_NEG_TTL_S = 24 * 3600        # retry unknown places daily
+
+PLACE_NOT_FOUND = "Place not found."
+
+
+def geocode_candidates(place, api_key, limit=5):
+    """Up to `limit` Geoapify matches, best first: [(lat, lon, formatted)]."""
+    if not api_key: raise RuntimeError("Geoapify key missing. Add GEOAPIFY_API_KEY in Secrets.")
+    base="https://api.geoapify.com/v1/geocode/search?"
+    q = urllib.parse.urlencode({"text":place, "format":"json", "limit":int(limit), "apiKey":api_key})
+    with urllib.request.urlopen(base+q, timeout=15) as r: j = json.loads(r.read().decode())
+    out = [(float(res["lat"]), float(res["lon"]), res.get("formatted", place)) for res in j.get("results") or []]
+    if out:
+        return out
+    raise RuntimeError(PLACE_NOT_FOUND)
+
+def geocode(place, api_key):
+    return geocode_candidates(place, api_key, 1)[0]
+
+
+def normalize_place(place):
+    """'  Mumbai ,Maharashtra,  INDIA ' -> 'mumbai, maharashtra, india'"""
+    s = unicodedata.normalize("NFKC", place or "").casefold()
+    parts = [" ".join(p.split()) for p in s.split(",")]
+    return ", ".join(p for p in parts if p)
+
+
+class GeocodeCache:
+    """LRU in front of a SQLite table. Values are (lat, lon, formatted) or None for a known miss."""
+
+    def __init__(self, db_path=GEOCODE_DB_PATH, maxsize=GEOCODE_LRU_SIZE, ttl=GEOCODE_TTL_S, neg_ttl=GEOCODE_NEG_TTL_S):
+        self.maxsize, self.ttl, self.neg_ttl = maxsize, ttl, neg_ttl
+        self._lru = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("CREATE TABLE IF NOT EXISTS geocode ("
+                                 "key TEXT PRIMARY KEY, lat REAL, lon REAL, formatted TEXT, expires REAL)")
+                self._db.commit()
+            except Exception:
+                self._db = None   # disk tier is optional; keep working from memory
+
+    def _remember(self, key, expires, value):
+        self._lru[key] = (expires, value); self._lru.move_to_end(key)
+        while len(self._lru) > self.maxsize:
+            self._lru.popitem(last=False)
+
+    def get(self, key):
+        """Return (hit, value). value None on a hit means a cached negative result."""
+        now = time.time()
+        with self._lock:
+            item = self._lru.get(key)
+            if item is not None:
+                if item[0] > now:
+                    self._lru.move_to_end(key); return True, item[1]
+                del self._lru[key]
+            if self._db is None:
+                return False, None
+            try:
+                row = self._db.execute("SELECT lat, lon, formatted, expires FROM geocode WHERE key=?", (key,)).fetchone()
+            except Exception:
+                return False, None
+            if not row or row[3] <= now:
+                return False, None
+            value = None if row[0] is None else (row[0], row[1], row[2])
+            self._remember(key, row[3], value)
+            return True, value
+
+    def put(self, key, value):
+        expires = time.time() + (self.ttl if value is not None else self.neg_ttl)
+        with self._lock:
+            self._remember(key, expires, value)
+            if self._db is None:
+                return
+            lat, lon, formatted = value if value is not None else (None, None, None)
+            try:
+                self._db.execute("INSERT OR REPLACE INTO geocode VALUES (?,?,?,?,?)", (key, lat, lon, formatted, expires))
+                self._db.commit()
+            except Exception:
+                pass
+
+    def lookup(self, place, resolver):
+        """Cached resolver(place) -> (lat, lon, formatted); raises RuntimeError(PLACE_NOT_FOUND) on a miss."""
+        key = normalize_place(place)
+        hit, value = self.get(key)
+        if not hit:
+            try:
+                value = resolver(place)
+            except RuntimeError as e:
+                if str(e) != PLACE_NOT_FOUND:
+                    raise
+                value = None
+            self.put(key, value)
+        if value is None:
+            raise RuntimeError(PLACE_NOT_FOUND)
+        return value
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_geocode_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = GeocodeCache()
+        return _default_cache
+
+def cached_geocode_candidates(place, api_key, limit=1, before_network=None):
+    """The one place resolver: bundled gazetteer first (exact, verified matches only), then the cached
+    Geoapify lookup. [(lat, lon, formatted)], best first; up to `limit` entries when Geoapify is asked,
+    one otherwise (only the best hit is cached). before_network() runs just before a request is sent
+    and may raise to abandon it. Raises RuntimeError like geocode()."""
+    gaz = get_gazetteer()
+    if gaz is not None:
+        p = gaz.lookup_place(place)
+        if p is not None:
+            return [(p.lat, p.lon, p.formatted)]
+    if not api_key: raise RuntimeError("Geoapify key missing. Add GEOAPIFY_API_KEY in Secrets.")
+    found = []
+    def resolver(text):
+        if before_network is not None:
+            before_network()
+        found[:] = geocode_candidates(text, api_key, limit)
+        return found[0]
+    best = get_geocode_cache().lookup(place, resolver)
+    return found or [best]
+
+def cached_geocode(place, api_key):
+    """Drop-in for geocode(): bundled gazetteer first, then the cached Geoapify lookup."""
+    return cached_geocode_candidates(place, api_key)[0]
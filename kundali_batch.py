@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+# kundali_batch.py
+# Command-line batch generation: one <name>_Horoscope.docx per row of a CSV / JSONL file.
+#   python kundali_batch.py people.csv -o out/ [-j 8]
+# Columns: name, dob (YYYY-MM-DD or DD-MM-YYYY), tob (HH:MM[:SS]), and either place or lat + lon;
+# optional tz (hours east of UTC, or an IANA zone name; default: from lat/lon and the birth date).
+# Places and timezones are resolved once per distinct value in the parent (gazetteer / SQLite geocode
+# cache / TimezoneFinder are loaded there only). Resolved rows then go through two process pools:
+# chart computation -> small picklable KundaliReport -> DOCX rendering, with output kept in input order.
+
+import argparse, csv, datetime, json, os, sys, time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import NamedTuple, Optional
+
+from geocode_helper import cached_geocode
+from timezone_helper import tzname_at, local_to_utc
+from kundali_report_lib import build_report, sanitize_filename
+from kundali_docx_lib import build_kundali_docx
+
+DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y")
+TIME_FORMATS = ("%H:%M:%S", "%H:%M")
+
+
+class BirthJob(NamedTuple):
+    """One fully resolved row, ready for a worker (picklable)."""
+    row: int
+    name: str
+    place: str
+    dt_local: datetime.datetime
+    dt_utc: datetime.datetime
+    lat: float
+    lon: float
+    tzname: str
+    tz_hours: float
+    used_manual: bool
+    out_path: str
+
+
+class BatchResult(NamedTuple):
+    row: int
+    name: str
+    out_path: Optional[str]
+    error: Optional[str]
+
+
+# ---- input ----
+def read_rows(path):
+    """Rows as dicts with lower-cased keys, from CSV or JSON Lines (by extension)."""
+    if path.lower().endswith((".jsonl", ".ndjson", ".json")):
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+    return [{str(k).strip().lower(): ("" if v is None else str(v).strip()) for k, v in r.items()} for r in rows]
+
+def _parse(value, formats, what):
+    for fmt in formats:
+        try:
+            return datetime.datetime.strptime(value, fmt)
+        except ValueError:
+            pass
+    raise ValueError(f"bad {what}: {value!r}")
+
+def parse_birth_datetime(dob, tob):
+    d = _parse(dob, DATE_FORMATS, "dob").date()
+    t = _parse(tob, TIME_FORMATS, "tob").time()
+    return datetime.datetime.combine(d, t)
+
+
+# ---- resolution (parent process) ----
+def resolve_places(rows, api_key):
+    """{place: (lat, lon) or exception} for every distinct place without explicit lat/lon."""
+    out = {}
+    for r in rows:
+        place = r.get("place", "")
+        if place and not (r.get("lat") and r.get("lon")) and place not in out:
+            try:
+                lat, lon, _ = cached_geocode(place, api_key)
+                out[place] = (lat, lon)
+            except Exception as e:
+                out[place] = e
+    return out
+
+def resolve_job(i, r, places, out_dir, used_names):
+    name = r.get("name", "")
+    place = r.get("place", "")
+    if r.get("lat") and r.get("lon"):
+        lat, lon = float(r["lat"]), float(r["lon"])
+        place = place or f"{lat:.4f}, {lon:.4f}"
+    else:
+        if not place:
+            raise ValueError("need place or lat/lon")
+        loc = places[place]
+        if isinstance(loc, Exception):
+            raise loc
+        lat, lon = loc
+    dt_local = parse_birth_datetime(r.get("dob", ""), r.get("tob", ""))
+
+    tz = r.get("tz", "")
+    used_manual = False
+    try:
+        tz_hours = float(tz) if tz else None
+    except ValueError:
+        tz_hours = None
+    if tz_hours is not None:
+        tzname, used_manual = f"UTC{tz_hours:+.2f} (manual)", True
+        dt_utc = dt_local - datetime.timedelta(hours=tz_hours)
+    else:
+        tzname = tz or tzname_at(lat, lon) or "Etc/UTC"
+        tz_hours, dt_utc = local_to_utc(tzname, dt_local)
+
+    # same file name as the app's download; _2, _3 ... when several rows share a name
+    stem = sanitize_filename(name) + "_Horoscope"
+    n = used_names.get(stem.casefold(), 0) + 1
+    used_names[stem.casefold()] = n
+    fname = f"{stem}.docx" if n == 1 else f"{stem}_{n}.docx"
+    return BirthJob(i, name, place, dt_local, dt_utc, lat, lon, tzname, tz_hours, used_manual,
+                    os.path.join(out_dir, fname))
+
+
+# ---- work: compute stage -> render stage ----
+def compute_job(job):
+    """Stage 1: chart and tables -> KundaliReport (a ~2.5 KB pickle)."""
+    return build_report(job.name, job.place, job.dt_local, job.dt_utc, job.lat, job.lon,
+                        job.tzname, job.tz_hours, job.used_manual)
+
+def render_report(report):
+    """Stage 2: python-docx tree building -> DOCX bytes (the CPU / GIL heavy part)."""
+    return build_kundali_docx(report)
+
+def _submit(pool, fn, arg):
+    # pool None: run the stage in this process
+    if pool is not None:
+        return pool.submit(fn, arg)
+    f = Future()
+    try:
+        f.set_result(fn(arg))
+    except Exception as e:
+        f.set_exception(e)
+    return f
+
+def _error(e):
+    return f"{type(e).__name__}: {e}"
+
+_END = object()
+
+def iter_pipeline(jobs, compute_workers=1, render_workers=1, window=None):
+    """Yield (job, docx_bytes, error) in input order.
+    Stage 1 (compute_job) and stage 2 (render_report) have their own process pools (0 workers = run
+    that stage in this process); a report moves to the render pool as soon as it is computed. At most
+    `window` jobs are in flight, so memory stays bounded and a slow consumer holds back both stages."""
+    window = window or 4 * max(1, compute_workers + render_workers)
+    cpool = ProcessPoolExecutor(compute_workers) if compute_workers else None
+    rpool = ProcessPoolExecutor(render_workers) if render_workers else None
+    try:
+        it = iter(jobs)
+        pending = deque()          # [job, compute future, render future or None], input order
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < window:
+                job = next(it, _END)
+                if job is _END:
+                    exhausted = True
+                else:
+                    pending.append([job, _submit(cpool, compute_job, job), None])
+            if not pending:
+                return
+            for entry in pending:
+                if entry[2] is None and entry[1].done() and entry[1].exception() is None:
+                    entry[2] = _submit(rpool, render_report, entry[1].result())
+            head = pending[0]
+            if head[1].done() and head[1].exception() is not None:
+                pending.popleft(); yield head[0], None, _error(head[1].exception())
+            elif head[2] is not None and head[2].done():
+                pending.popleft()
+                e = head[2].exception()
+                if e is not None:
+                    yield head[0], None, _error(e)
+                else:
+                    yield head[0], head[2].result(), None
+            else:
+                busy = [e[2] if e[2] is not None else e[1] for e in pending]
+                wait([f for f in busy if not f.done()], return_when=FIRST_COMPLETED)
+    finally:
+        for pool in (cpool, rpool):
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+
+def split_workers(total):
+    """(compute, render) process counts for `total` workers: computing a report is ~2 ms against
+    ~100 ms of DOCX building, so one compute process feeds about eight renderers."""
+    total = total or os.cpu_count() or 1
+    if total <= 1:
+        return 0, 0
+    compute = max(1, total // 9)
+    return compute, max(1, total - compute)
+
+
+def run_batch(rows, out_dir, workers=None, api_key="", compute_workers=None, render_workers=None):
+    """Generate every row; returns BatchResults in input order (row numbers are 1-based)."""
+    os.makedirs(out_dir, exist_ok=True)
+    places = resolve_places(rows, api_key)
+    jobs, results, used_names = [], [], {}
+    for i, r in enumerate(rows, 1):
+        try:
+            jobs.append(resolve_job(i, r, places, out_dir, used_names))
+        except Exception as e:
+            results.append(BatchResult(i, r.get("name", ""), None, _error(e)))
+
+    c, rn = split_workers(workers)
+    c = c if compute_workers is None else compute_workers
+    rn = rn if render_workers is None else render_workers
+    for job, data, err in iter_pipeline(jobs, c, rn):
+        if err is None:
+            try:
+                with open(job.out_path, "wb") as f:
+                    f.write(data)
+            except OSError as e:
+                err = _error(e)
+        results.append(BatchResult(job.row, job.name, job.out_path if err is None else None, err))
+    results.sort(key=lambda r: r.row)
+    return results
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate one Kundali DOCX per row of a CSV / JSONL file.")
+    ap.add_argument("input", help="CSV or JSONL with name, dob, tob, place or lat/lon, optional tz")
+    ap.add_argument("-o", "--out-dir", default="kundali_out")
+    ap.add_argument("-j", "--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    ap.add_argument("--compute-workers", type=int, help="chart processes (0: in the main process; default ~1 per 9 workers)")
+    ap.add_argument("--render-workers", type=int, help="DOCX processes (0: in the main process; default: the rest)")
+    ap.add_argument("--api-key", default=os.getenv("GEOAPIFY_API_KEY", ""),
+                    help="Geoapify key for places not in the bundled gazetteer (default: $GEOAPIFY_API_KEY)")
+    args = ap.parse_args(argv)
+
+    rows = read_rows(args.input)
+    t0 = time.perf_counter()
+    results = run_batch(rows, args.out_dir, args.workers, args.api_key, args.compute_workers, args.render_workers)
+    elapsed = time.perf_counter() - t0
+
+    ok = [r for r in results if r.error is None]
+    failed = [r for r in results if r.error is not None]
+    print(f"{len(ok)}/{len(results)} written to {args.out_dir} in {elapsed:.2f} s "
+          f"({len(ok) / elapsed if elapsed else 0:.1f} reports/s)")
+    for r in failed:
+        print(f"  row {r.row} {r.name!r}: {r.error}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
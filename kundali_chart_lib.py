@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+# kundali_chart_lib.py
+# North-Indian diamond chart as a DOCX VML fragment.
+# Everything except the planet boxes depends only on (size_pt, lagna_sign): house polygons,
+# centroids, the clamped / nudged house-number boxes and the frame XML are computed once per
+# key and cached; a request only lays out its planet overlay and parses the joined string.
+# The in-app preview is an SVG of the same layout (kundali_svg), cached by chart content.
+
+from functools import lru_cache
+
+from docx.oxml import parse_xml
+
+# --- Appearance configuration ---
+# Sizing (pt) — tuned smaller to reduce white space
+NUM_W_PT = 10       # house number box width (was 12)
+NUM_H_PT = 12       # house number box height (was 14)
+PLANET_W_PT = 20    # planet label box width (was 16)
+PLANET_H_PT = 16    # planet label box height (was 14)
+GAP_X_PT = 3        # horizontal gap between planet boxes (was 4)
+OFFSET_Y_PT = 10    # vertical offset below number box (was 12)
+
+DEFAULT_CHART_PT = 318
+
+
+def _xml_text(s):
+    return (str(s).replace("&","&amp;").replace("<","&lt;").replace(">","&gt;"))
+
+def rotated_house_labels(lagna_sign):
+    order = [str(((lagna_sign - 1 + i) % 12) + 1) for i in range(12)]
+    return {"1":order[0],"2":order[1],"3":order[2],"4":order[3],"5":order[4],"6":order[5],"7":order[6],"8":order[7],"9":order[8],"10":order[9],"11":order[10],"12":order[11]}
+
+
+# ---- geometry ----
+def _rects_overlap(a, b):
+    return not (a['right'] <= b['left'] or a['left'] >= b['right'] or a['bottom'] <= b['top'] or a['top'] >= b['bottom'])
+
+def _nudge_number_box(base_left, base_top, w, h, S, occupied):
+    cx = S/2.0; cy = S/2.0
+    bx = base_left + w/2.0; by = base_top + h/2.0
+    vx = (bx - cx); vy = (by - cy)
+    n = (vx*vx + vy*vy) ** 0.5 or 1.0
+    ux, uy = vx/n, vy/n  # unit vector outward
+    pad = 2.0
+    for step in range(0, 9):  # try nudges up to ~16pt
+        dx = ux * (step * 2.0)
+        dy = uy * (step * 2.0)
+        l = max(pad, min(S - w - pad, base_left + dx))
+        t = max(pad, min(S - h - pad, base_top + dy))
+        r = {'left': l, 'top': t, 'right': l + w, 'bottom': t + h}
+        hit = False
+        for o in occupied:
+            if _rects_overlap(r, o):
+                hit = True; break
+        if not hit:
+            return l, t
+    return base_left, base_top
+
+def _bbox_of_poly(poly):
+    xs, ys = zip(*poly)
+    return {'left': min(xs), 'top': min(ys), 'right': max(xs), 'bottom': max(ys)}
+
+def _clamp_in_bbox(left, top, w, h, bbox, pad):
+    lmin = bbox['left'] + pad
+    tmin = bbox['top'] + pad
+    lmax = bbox['right'] - w - pad
+    tmax = bbox['bottom'] - h - pad
+    return max(lmin, min(left, lmax)), max(tmin, min(top, tmax))
+
+def house_polygons(S):
+    TM=(S/2,0); RM=(S,S/2); BM=(S/2,S); LM=(0,S/2)
+    P_lt=(S/4,S/4); P_rt=(3*S/4,S/4); P_rb=(3*S/4,3*S/4); P_lb=(S/4,3*S/4); O=(S/2,S/2)
+    return {
+        "1":[TM,P_rt,O,P_lt],
+        "2":[(0,0),TM,P_lt],
+        "3":[(0,0),LM,P_lt],
+        "4":[LM,O,P_lt,P_lb],
+        "5":[LM,(0,S),P_lb],
+        "6":[(0,S),BM,P_lb],
+        "7":[BM,P_rb,O,P_lb],
+        "8":[BM,(S,S),P_rb],
+        "9":[RM,(S,S),P_rb],
+        "10":[RM,O,P_rt,P_rb],
+        "11":[(S,0),RM,P_rt],
+        "12":[TM,(S,0),P_rt],
+    }
+
+def _centroid(poly):
+    A=Cx=Cy=0.0; n=len(poly)
+    for i in range(n):
+        x1,y1=poly[i]; x2,y2=poly[(i+1)%n]
+        cross=x1*y2 - x2*y1
+        A+=cross; Cx+=(x1+x2)*cross; Cy+=(y1+y2)*cross
+    A*=0.5
+    if abs(A)<1e-9:
+        xs,ys=zip(*poly); return (sum(xs)/n, sum(ys)/n)
+    return (Cx/(6*A), Cy/(6*A))
+
+@lru_cache(maxsize=32)
+def chart_geometry(S):
+    """((house, centroid_x, centroid_y, num_left, num_top), ...) in house order 1..12."""
+    out = []; occupied_rects = []
+    num_w = NUM_W_PT; num_h = NUM_H_PT
+    for k, poly in house_polygons(S).items():
+        bbox = _bbox_of_poly(poly)
+        x,y = _centroid(poly); left = x - num_w/2; top = y - num_h/2
+        left, top = _clamp_in_bbox(left, top, num_w, num_h, bbox, pad=2)
+        left, top = _nudge_number_box(left, top, num_w, num_h, S, occupied_rects)
+        occupied_rects.append({'left': left, 'top': top, 'right': left + num_w, 'bottom': top + num_h})
+        out.append((int(k), x, y, left, top))
+    return tuple(out)
+
+
+# ---- XML ----
+@lru_cache(maxsize=256)
+def _frame_xml(S, lagna_sign):
+    """(head, tail): chart frame plus house-number boxes, and the closing tags."""
+    L,T,R,B=0,0,S,S
+    labels = rotated_house_labels(lagna_sign)
+    num_w=NUM_W_PT; num_h=NUM_H_PT
+    num_boxes = []
+    for k, x, y, left, top in chart_geometry(S):
+        num_boxes.append(f'''
+        <v:rect style="position:absolute;left:{left}pt;top:{top}pt;width:{num_w}pt;height:{num_h}pt;z-index:80" fillcolor="#ffffff" strokecolor="none" strokeweight="0pt">
+          <v:textbox inset="0,0,0,0">
+            <w:txbxContent xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+              <w:p><w:pPr><w:jc w:val="center"/></w:pPr><w:r><w:t>{labels[str(k)]}</w:t></w:r></w:p>
+            </w:txbxContent>
+          </v:textbox>
+        </v:rect>
+        ''')
+    head = f'''
+    <w:p xmlns:w=\"http://schemas.openxmlformats.org/wordprocessingml/2006/main\"><w:pPr><w:spacing w:before=\"0\" w:after=\"0\"/></w:pPr><w:r>
+      <w:pict xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office" xmlns:w10="urn:schemas-microsoft-com:office:word"><w10:wrap type="topAndBottom"/>
+        <v:group style="position:relative;margin-left:auto;margin-right:auto;margin-top:0;width:{S}pt;height:{S}pt" coordorigin="0,0" coordsize="{S},{S}">
+          <v:rect style="position:absolute;left:0;top:0;width:{S}pt;height:{S}pt;z-index:1" strokecolor="#CC6600" strokeweight="3pt" fillcolor="#ffdcc8"/>
+          <v:line style="position:absolute;z-index:2" from="{L},{T}" to="{R},{B}" strokecolor="#CC6600" strokeweight="1.25pt"/>
+          <v:line style="position:absolute;z-index:2" from="{R},{T}" to="{L},{B}" strokecolor="#CC6600" strokeweight="1.25pt"/>
+          <v:line style="position:absolute;z-index:2" from="{S/2},{T}" to="{R},{S/2}" strokecolor="#CC6600" strokeweight="1.25pt"/>
+          <v:line style="position:absolute;z-index:2" from="{R},{S/2}" to="{S/2},{B}" strokecolor="#CC6600" strokeweight="1.25pt"/>
+          <v:line style="position:absolute;z-index:2" from="{S/2},{B}" to="{L},{S/2}" strokecolor="#CC6600" strokeweight="1.25pt"/>
+          <v:line style="position:absolute;z-index:2" from="{L},{S/2}" to="{S/2},{T}" strokecolor="#CC6600" strokeweight="1.25pt"/>
+          ''' + "\\n".join(num_boxes)
+    tail = '''
+        </v:group>
+      </w:pict>
+    </w:r></w:p>
+    '''
+    return head, tail
+
+def _planet_items(house_planets, k):
+    for pl in house_planets.get(k, []):
+        # normalize input item
+        if isinstance(pl, dict):
+            label = str(pl.get('txt', '')).strip() or '?'
+            fl = pl.get('flags', {}) or {}
+        else:
+            label = str(pl).strip() or '?'
+            fl = {}
+        try:
+            selfr = bool(fl.get('self'))
+            varg  = bool(fl.get('vargottama'))
+        except Exception:
+            selfr = varg = False
+        yield label, selfr, varg
+
+def planet_layout(S, house_planets):
+    """[(label, left, top, w, h, self_ruled, vargottama), ...]: planet boxes laid out below each house number."""
+    p_w,p_h=PLANET_W_PT,PLANET_H_PT; gap_x=GAP_X_PT; offset_y=OFFSET_Y_PT
+    out = []
+    for k, x, y, _, _ in chart_geometry(S):
+        planets = list(_planet_items(house_planets, k))
+        if not planets:
+            continue
+        n = len(planets)
+        max_cols = 2  # wrap after this many per row
+        rows = (n + max_cols - 1) // max_cols
+        gap_y = 2
+        # start rows just below the number box
+        grid_top = y + (p_h/2 + 2) + offset_y
+        for idx, (label, selfr, varg) in enumerate(planets):
+            r = idx // max_cols
+            c = idx % max_cols
+            # columns in this row (last row can be shorter)
+            cols_this = max_cols if r < rows - 1 else (n - max_cols * (rows - 1)) or max_cols
+            row_w = cols_this * p_w + (cols_this - 1) * gap_x
+            row_left = x - row_w / 2
+            top_box = grid_top + r * (p_h + gap_y) - p_h / 2
+            # keep within chart square bounds with margin and tiny shrink on edges
+            M = 5
+            row_left = max(M, min(row_left, S - row_w - M))
+            top_box  = max(M, min(top_box,  S - p_h - M))
+            edge_touch = (row_left <= M + 0.05) or (row_left >= S - row_w - M - 0.05) or (top_box <= M + 0.05) or (top_box >= S - p_h - M - 0.05)
+            pw = p_w - (1 if edge_touch else 0)
+            ph = p_h - (1 if edge_touch else 0)
+            left_pl = row_left + c * (pw + gap_x)
+            out.append((label, left_pl, top_box, pw, ph, selfr, varg))
+    return out
+
+def _planet_boxes(S, house_planets):
+    """VML for the planet labels (and self-ruled / vargottama marks) below each house number."""
+    planet_boxes = []
+    for label, left_pl, top_box, pw, ph, selfr, varg in planet_layout(S, house_planets):
+        planet_boxes.append(
+            f"<v:rect style=\"position:absolute;left:{left_pl}pt;top:{top_box}pt;width:{pw}pt;height:{ph}pt;z-index:6\" strokecolor=\"none\">"
+            + "<v:textbox inset=\"0,0,0,0\">"
+            + "<w:txbxContent xmlns:w=\"http://schemas.openxmlformats.org/wordprocessingml/2006/main\">"
+            + f"<w:p><w:pPr><w:jc w:val=\"center\"/></w:pPr><w:r><w:t>{_xml_text(label)}</w:t></w:r></w:p>"
+            + "</w:txbxContent>"
+            + "</v:textbox>"
+            + "</v:rect>"
+        )
+        # overlays
+        if selfr:
+            circle_left = left_pl + 2
+            circle_top  = top_box + 1
+            circle_w    = pw - 4
+            circle_h    = ph - 2
+            planet_boxes.append(
+                f"<v:oval style=\"position:absolute;left:{circle_left}pt;top:{circle_top}pt;width:{circle_w}pt;height:{circle_h}pt;z-index:7\" fillcolor=\"none\" strokecolor=\"black\" strokeweight=\"0.75pt\"/>"
+            )
+        if varg:
+            badge_w = 5; badge_h = 5
+            badge_left = left_pl + pw - badge_w + 0.5
+            badge_top  = top_box - 2
+            planet_boxes.append(
+                f"<v:rect style=\"position:absolute;left:{badge_left}pt;top:{badge_top}pt;width:{badge_w}pt;height:{badge_h}pt;z-index:8\" fillcolor=\"#ffffff\" strokecolor=\"black\" strokeweight=\"0.75pt\"/>"
+            )
+    return planet_boxes
+
+def kundali_chart_xml(size_pt=DEFAULT_CHART_PT, lagna_sign=1, house_planets=None):
+    head, tail = _frame_xml(size_pt, lagna_sign)
+    planet_boxes = _planet_boxes(size_pt, house_planets or {})
+    if planet_boxes:
+        head = head + "\\n" + "\\n".join(planet_boxes)
+    return head + tail
+
+def kundali_with_planets(size_pt=None, lagna_sign=1, house_planets=None):
+    """Chart paragraph (w:p with a VML group); house_planets maps house 1..12 to labels or {'txt','flags'} dicts."""
+    return parse_xml(kundali_chart_xml(size_pt or DEFAULT_CHART_PT, lagna_sign, house_planets))
+
+
+# ---- SVG preview ----
+SVG_FONT = "Mangal, 'Noto Sans Devanagari', 'Nirmala UI', sans-serif"
+
+def _svg_text(s):
+    return _xml_text(s).replace('"', "&quot;")
+
+def _house_planets_key(house_planets):
+    return tuple((k, tuple(_planet_items(house_planets, k))) for k in range(1, 13))
+
+@lru_cache(maxsize=256)
+def _kundali_svg_cached(S, lagna_sign, key):
+    house_planets = {k: [{'txt': label, 'flags': {'self': selfr, 'vargottama': varg}} for label, selfr, varg in items]
+                     for k, items in key}
+    labels = rotated_house_labels(lagna_sign)
+    h = S / 2
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {S} {S}" width="100%" '
+        f'font-family="{SVG_FONT}" font-size="7" text-anchor="middle" dominant-baseline="central">',
+        f'<rect x="0" y="0" width="{S}" height="{S}" fill="#ffdcc8" stroke="#CC6600" stroke-width="3"/>',
+        f'<g stroke="#CC6600" stroke-width="1.25">'
+        f'<line x1="0" y1="0" x2="{S}" y2="{S}"/><line x1="{S}" y1="0" x2="0" y2="{S}"/>'
+        f'<polygon points="{h},0 {S},{h} {h},{S} 0,{h}" fill="none"/></g>',
+    ]
+    for k, x, y, left, top in chart_geometry(S):
+        parts.append(f'<rect x="{left}" y="{top}" width="{NUM_W_PT}" height="{NUM_H_PT}" fill="#ffffff"/>'
+                     f'<text x="{left + NUM_W_PT/2}" y="{top + NUM_H_PT/2}">{labels[str(k)]}</text>')
+    for label, left, top, pw, ph, selfr, varg in planet_layout(S, house_planets):
+        parts.append(f'<text x="{left + pw/2}" y="{top + ph/2}">{_svg_text(label)}</text>')
+        if selfr:
+            parts.append(f'<ellipse cx="{left + pw/2}" cy="{top + ph/2}" rx="{(pw - 4)/2}" ry="{(ph - 2)/2}" '
+                         'fill="none" stroke="black" stroke-width="0.75"/>')
+        if varg:
+            parts.append(f'<rect x="{left + pw - 4.5}" y="{top - 2}" width="5" height="5" '
+                         'fill="#ffffff" stroke="black" stroke-width="0.75"/>')
+    parts.append('</svg>')
+    return "".join(parts)
+
+def kundali_svg(size_pt=DEFAULT_CHART_PT, lagna_sign=1, house_planets=None):
+    """Same chart as kundali_with_planets() as a standalone SVG string; cached per chart content."""
+    return _kundali_svg_cached(size_pt, lagna_sign, _house_planets_key(house_planets or {}))
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# kundali_dasha_lib.py
+# Vimshottari dasha as a lazily expanded tree: महादशा -> अंतरदशा -> प्रत्यंतर -> सूक्ष्म -> प्राण.
+# A node only creates its nine sub-periods when they are first asked for, so "what is running now"
+# touches 5 x 9 nodes instead of the 9^5 (59k) periods of a full lifetime, and times stay Julian-day
+# floats until a caller wants datetimes. Sub-periods come from kundali_engine_lib.sub_periods(), one
+# NumPy call per level for all the nodes being expanded together (periods() walks level by level).
+# The whole tree follows from the birth JD and the Moon's longitude, which is all that is pickled /
+# serialized.
+# Unlike the flat md_segments (first MD squeezed into the balance), the tree runs the full 120-year
+# cycle from the birth MD's notional start, so the first MD's sub-periods are the traditional ones.
+
+import bisect
+import numbers
+import struct
+
+from kundali_engine_lib import ORDER, YEARS, YEAR_DAYS, moon_balance_days, sub_periods, jd_from_datetimes, datetime_from_jd
+
+DASHA_LEVELS = 5
+LEVEL_NAMES = ("महादशा", "अंतरदशा", "प्रत्यंतर दशा", "सूक्ष्म दशा", "प्राण दशा")
+_PACK = struct.Struct("<ddB")
+_LORD_INDEX = {L: i for i, L in enumerate(ORDER)}
+
+
+class DashaNode:
+    """One period; level 1 = महादशा ... 5 = प्राण. start / end are Julian days (UT).
+    levels is the depth of the owning tree; nodes at that level have no children."""
+    __slots__ = ("lord", "level", "start", "end", "parent", "levels", "_children", "_starts")
+
+    def __init__(self, lord, level, start, end, parent=None, levels=DASHA_LEVELS):
+        self.lord, self.level, self.start, self.end, self.parent = lord, level, start, end, parent
+        self.levels = levels
+        self._children = None
+        self._starts = None
+
+    def __repr__(self):
+        return f"DashaNode({self.lord!r}, level={self.level}, {self.start_utc:%Y-%m-%d} .. {self.end_utc:%Y-%m-%d})"
+
+    @property
+    def days(self):
+        return self.end - self.start
+
+    @property
+    def start_utc(self):
+        return datetime_from_jd(self.start)
+
+    @property
+    def end_utc(self):
+        return datetime_from_jd(self.end)
+
+    @property
+    def children(self):
+        """The nine sub-periods, starting with this node's own lord (empty at the tree's last level)."""
+        if self._children is None:
+            _expand((self,))
+        return self._children
+
+    def child_at(self, jd):
+        kids = self.children
+        if not kids or not self.start <= jd < self.end:
+            return None
+        return kids[bisect.bisect_right(self._starts, jd) - 1]
+
+
+def _expand(nodes):
+    """Create the children of every not yet expanded node in one sub_periods() call."""
+    todo = []
+    for n in nodes:
+        if n._children is None:
+            if n.level >= n.levels:
+                n._children = ()
+            else:
+                todo.append(n)
+    if not todo:
+        return
+    sub, start, end = sub_periods([_LORD_INDEX[n.lord] for n in todo], [n.start for n in todo],
+                                  [n.days for n in todo])
+    end[:, 8] = [n.end for n in todo]      # last sub-period closes exactly at the parent's end
+    for n, ls, ss, es in zip(todo, sub.tolist(), start.tolist(), end.tolist()):
+        n._children = tuple(DashaNode(ORDER[L], n.level + 1, a, b, n, n.levels) for L, a, b in zip(ls, ss, es))
+        n._starts = ss
+
+
+def _as_jd(when):
+    """JD float from a JD (any real number, e.g. int or np.float64) or a naive UTC datetime."""
+    return float(when) if isinstance(when, numbers.Real) else float(jd_from_datetimes([when])[0])
+
+
+class DashaTree:
+    """Vimshottari tree for one birth; expands on demand."""
+
+    def __init__(self, birth_jd, moon_sid, levels=DASHA_LEVELS):
+        self.birth_jd, self.moon_sid, self.levels = float(birth_jd), float(moon_sid), int(levels)
+        md_lord, rem_days = moon_balance_days(self.moon_sid)
+        start = self.birth_jd - (YEARS[md_lord] * YEAR_DAYS - rem_days)
+        self.root = DashaNode(md_lord, 0, start, start + 120.0 * YEAR_DAYS, levels=self.levels)
+
+    @classmethod
+    def from_chart(cls, chart, levels=DASHA_LEVELS):
+        return cls(chart.jd, chart.sidelons['Mo'], levels)
+
+    # compact serialization: the tree is a pure function of (birth JD, Moon longitude)
+    def to_bytes(self):
+        return _PACK.pack(self.birth_jd, self.moon_sid, self.levels)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(*_PACK.unpack(data))
+
+    def __reduce__(self):
+        return (DashaTree, (self.birth_jd, self.moon_sid, self.levels))
+
+    @property
+    def mahadashas(self):
+        return self.root.children
+
+    def active_path(self, when, depth=None):
+        """[महादशा, अंतरदशा, ...] nodes running at `when` (JD or naive UTC datetime), `depth` levels deep."""
+        jd = _as_jd(when)
+        path, node = [], self.root
+        for _ in range(min(depth or self.levels, self.levels)):
+            node = node.child_at(jd)
+            if node is None:
+                break
+            path.append(node)
+        return path
+
+    def periods(self, level, start=None, end=None):
+        """Nodes of one level (1..levels) overlapping [start, end) (JDs or naive UTC datetimes), in time
+        order; only the branches that overlap the window are expanded."""
+        lo = self.root.start if start is None else _as_jd(start)
+        hi = self.root.end if end is None else _as_jd(end)
+        nodes = [self.root]
+        for _ in range(min(level, self.levels)):
+            _expand(nodes)
+            nodes = [c for n in nodes for c in n.children if c.end > lo and c.start < hi]
+        return nodes
@@ -0,0 +1,1092 @@
+# -*- coding: utf-8 -*-
+# kundali_docx_lib.py
+# One-page Kundali DOCX writer (python-docx + VML), moved out of app.py so it can run without
+# Streamlit: build_kundali_docx(report) -> bytes for a kundali_report_lib.KundaliReport.
+
+from io import BytesIO
+
+from docx.enum.table import WD_ROW_HEIGHT_RULE, WD_ALIGN_VERTICAL, WD_TABLE_ALIGNMENT
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import qn
+from docx.shared import Inches, Pt, RGBColor
+
+from docx_template_helper import new_styled_document
+from kundali_chart_lib import kundali_with_planets
+from kundali_report_lib import POSITIONS_HEADER, MAHADASHA_HEADER, ANTARDASHA_HEADER
+
+BASE_FONT_PT = 7.0
+LATIN_FONT = "Georgia"
+HINDI_FONT = "Mangal"
+
+RIGHT_WIDTH_IN = 3.70                       # chart column of the main layout table
+CHART_W_PT = int(RIGHT_WIDTH_IN * 72 - 10)   # chart square size used in the DOCX (and the in-app SVG)
+
+
+def set_cell_margins(cell, *, left=None, right=None, top=None, bottom=None):
+    try:
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+        tc = cell._tc
+        tcPr = tc.get_or_add_tcPr()
+        for el in list(tcPr):
+            if el.tag.endswith('tcMar'):
+                tcPr.remove(el)
+        tcMar = OxmlElement('w:tcMar')
+        for side, val in (('left', left), ('right', right), ('top', top), ('bottom', bottom)):
+            if val is not None:
+                el = OxmlElement(f'w:{side}')
+                el.set(qn('w:w'), str(int(val)))
+                el.set(qn('w:type'), 'dxa')
+                tcMar.append(el)
+        tcPr.append(tcMar)
+    except Exception:
+        pass
+
+def zero_table_cell_margins(table):
+    """Set w:tblCellMar for all sides to 0 to remove extra top/bottom padding inside table cells."""
+    try:
+        from docx.oxml import OxmlElement
+        from docx.oxml.ns import qn
+        tbl = table._tbl
+        tblPr = tbl.tblPr
+        # Remove existing cell margins if present
+        for el in list(tblPr):
+            if el.tag.endswith('tblCellMar'):
+                tblPr.remove(el)
+        cellMar = OxmlElement('w:tblCellMar')
+        for side in ('top','left','bottom','right'):
+            m = OxmlElement(f'w:{side}')
+            m.set(qn('w:w'), '0')
+            m.set(qn('w:type'), 'dxa')
+            cellMar.append(m)
+        tblPr.append(cellMar)
+    except Exception:
+        pass
+
+def compact_document_spacing(doc):
+    """Reduce vertical whitespace across the document."""
+    try:
+        from docx.shared import Pt
+        try:
+            st = doc.styles["Normal"].paragraph_format
+            st.space_before = Pt(0)
+            st.space_after = Pt(0)
+            st.line_spacing = 1.0
+        except Exception:
+            pass
+        for p in doc.paragraphs:
+            try:
+                p.paragraph_format.space_before = Pt(0)
+                p.paragraph_format.space_after = Pt(0)
+            except Exception:
+                pass
+        for tbl in doc.tables:
+            for row in tbl.rows:
+                for cell in row.cells:
+                    for p in cell.paragraphs:
+                        try:
+                            p.paragraph_format.space_before = Pt(0)
+                            p.paragraph_format.space_after = Pt(0)
+                        except Exception:
+                            pass
+    except Exception:
+        pass
+
+def add_table_borders(table, size=6):
+    tbl = table._tbl; tblPr = tbl.tblPr; tblBorders = OxmlElement('w:tblBorders')
+    for edge in ('top','left','bottom','right','insideH','insideV'):
+        el = OxmlElement(f'w:{edge}'); el.set(qn('w:val'),'single'); el.set(qn('w:sz'),str(size)); tblBorders.append(el)
+    tblPr.append(tblBorders)
+
+def set_table_font(table, pt=8.0):
+    for row in table.rows:
+        for cell in row.cells:
+            for p in cell.paragraphs:
+                for r in p.runs: r.font.size = Pt(pt)
+
+def center_header_row(table):
+    for cell in table.rows[0].cells:
+        for par in cell.paragraphs:
+            par.alignment = WD_ALIGN_PARAGRAPH.CENTER
+            if par.runs: par.runs[0].bold = True
+
+def set_col_widths(table, widths_inch):
+    table.autofit = False
+    for row in table.rows:
+        for i, w in enumerate(widths_inch):
+            row.cells[i].width = Inches(w)
+
+def compact_table_paragraphs(tbl):
+    try:
+        for row in tbl.rows:
+            for cell in row.cells:
+                for p in cell.paragraphs:
+                    p.paragraph_format.space_before = Pt(0)
+                    p.paragraph_format.space_after = Pt(0)
+    except Exception:
+        pass
+
+def _apply_hindi_caption_style(paragraph, size_pt=11, underline=True, bold=True):
+    if not paragraph.runs:
+        paragraph.add_run("")
+    r = paragraph.runs[0]
+    r.bold = bold; r.underline = underline; r.font.size = Pt(size_pt)
+    rpr = r._element.rPr or OxmlElement('w:rPr')
+    if r._element.rPr is None: r._element.append(rpr)
+    rfonts = rpr.find(qn('w:rFonts')) or OxmlElement('w:rFonts')
+    if rpr.find(qn('w:rFonts')) is None: rpr.append(rfonts)
+    rfonts.set(qn('w:eastAsia'), HINDI_FONT)
+
+def create_cylindrical_section_header(container, title_text, width_pt=320, align='center', spacing_after=20, text_jc='center', run_text=True, line_exact=False):
+    """Create modern cylindrical tube-shaped section headers with dynamic width"""
+    # Create paragraph for the header
+    header_para = container.add_paragraph()
+    header_para.alignment = (WD_ALIGN_PARAGRAPH.RIGHT if align=='right' else (WD_ALIGN_PARAGRAPH.LEFT if align=='left' else WD_ALIGN_PARAGRAPH.CENTER))
+    header_para.paragraph_format.space_before = Pt(0)
+    header_para.paragraph_format.space_after = Pt(0)
+    # If requested, set exact line spacing to the minimum to avoid phantom height
+    if line_exact:
+        try:
+            pPr = header_para._p.get_or_add_pPr()
+            from docx.oxml import OxmlElement
+            from docx.oxml.ns import qn
+            # Remove existing spacing element if present
+            for el in list(pPr):
+                if el.tag == qn('w:spacing'):
+                    pPr.remove(el)
+            sp = OxmlElement('w:spacing')
+            sp.set(qn('w:before'), '0'); sp.set(qn('w:after'), str(int(spacing_after)))
+            sp.set(qn('w:line'), '1'); sp.set(qn('w:lineRule'), 'exact')
+            pPr.append(sp)
+        except Exception:
+            pass
+    
+    # Add the title text with styling
+    if run_text:
+        run = header_para.add_run(title_text)
+        run.font.name = 'Calibri'
+        run.font.size = Pt(12)
+        run.font.bold = True
+        run.font.color.rgb = RGBColor(255, 255, 255)  # White text
+    
+    # Add beautiful gradient background styling using VML shape 
+    xml_content = f'''
+    <w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+      <w:pPr>
+        <w:jc w:val="{text_jc}"/>
+        <w:spacing w:before="120" w:after="100"/>
+      </w:pPr>
+      <w:r>
+        <w:pict xmlns:v="urn:schemas-microsoft-com:vml" xmlns:o="urn:schemas-microsoft-com:office:office" xmlns:w10="urn:schemas-microsoft-com:office:word"><w10:wrap type="topAndBottom"/>
+          <v:roundrect style="position:relative;width:{width_pt}pt;height:28pt;margin-left:auto;margin-right:auto" 
+                       arcsize="45%" strokecolor="#D2691E" strokeweight="1.5pt">
+            <v:fill type="gradient" color="#F15A23" color2="#FFEACC" angle="90" opacity="1"/>
+            <v:textbox inset="8pt,4pt,8pt,4pt">
+              <w:txbxContent>
+                <w:p>
+                  <w:pPr><w:jc w:val="{text_jc}"/></w:pPr>
+                  <w:r>
+                    <w:rPr>
+                      <w:color w:val="FFFFFF"/>
+                      <w:sz w:val="24"/>
+                      <w:b/>
+                      <w:rFonts w:ascii="Calibri" w:hAnsi="Calibri"/>
+                    </w:rPr>
+                    <w:t>{title_text}</w:t>
+                  </w:r>
+                </w:p>
+              </w:txbxContent>
+            </v:textbox>
+          </v:roundrect>
+        </w:pict>
+      </w:r>
+    </w:p>'''
+    
+    try:
+        from docx.oxml import parse_xml
+        header_element = parse_xml(xml_content)
+        container._element.append(header_element)
+        # Remove the original paragraph we added
+        container._element.remove(header_para._element)
+    except Exception:
+        # Fallback to simple styled text if VML fails
+        pass
+    # Ensure spacing after header so following table starts below the bar
+    try:
+        spacer = container.add_paragraph()
+        spacer.paragraph_format.space_after = Pt(0)
+    except Exception:
+        pass
+
+def create_unified_personal_details_box(container, name, dob, tob, place):
+    """Create single rounded corner box with title inside, matching reference image exactly"""
+    
+    # Try to create a rounded rectangle using VML for truly rounded corners
+    try:
+        # Create VML rounded rectangle
+        xml_content = f'''
+        <w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+          <w:pPr>
+            <w:spacing w:before="0" w:after="120"/>
+          </w:pPr>
+          <w:r>
+            <w:pict xmlns:v="urn:schemas-microsoft-com:vml">
+              <v:roundrect style="position:relative;width:332pt;height:130pt" 
+                           arcsize="15%" fillcolor="white" strokecolor="#F15A23" strokeweight="1.5pt">
+                <v:textbox inset="12pt,10pt,12pt,10pt">
+                  <w:txbxContent>
+                    <w:p>
+                      <w:pPr><w:jc w:val="center"/><w:spacing w:after="120"/></w:pPr>
+                      <w:r>
+                        <w:rPr>
+                          <w:color w:val="F15A23"/>
+                          <w:sz w:val="22"/>
+                          <w:b/>
+                          <w:u/>
+                        </w:rPr>
+                        <w:t>व्यक्तिगत विवरण</w:t>
+                      </w:r>
+                    </w:p>
+                    <w:p>
+                      <w:pPr>
+                        <w:spacing w:after="80"/>
+                        <w:tabs>
+                          <w:tab w:val="left" w:pos="1440"/>
+                        </w:tabs>
+                      </w:pPr>
+                      <w:r>
+                        <w:rPr>
+                          <w:color w:val="F15A23"/>
+                          <w:sz w:val="20"/>
+                          <w:b/>
+                          <w:u/>
+                        </w:rPr>
+                        <w:t>नाम :</w:t>
+                      </w:r>
+                      <w:r>
+                        <w:tab/>
+                        <w:rPr>
+                          <w:color w:val="000000"/>
+                          <w:sz w:val="20"/>
+                        </w:rPr>
+                        <w:t>{name}</w:t>
+                      </w:r>
+                    </w:p>
+                    <w:p>
+                      <w:pPr>
+                        <w:spacing w:after="80"/>
+                        <w:tabs>
+                          <w:tab w:val="left" w:pos="1440"/>
+                        </w:tabs>
+                      </w:pPr>
+                      <w:r>
+                        <w:rPr>
+                          <w:color w:val="F15A23"/>
+                          <w:sz w:val="20"/>
+                          <w:b/>
+                          <w:u/>
+                        </w:rPr>
+                        <w:t>जन्म तिथि :</w:t>
+                      </w:r>
+                      <w:r>
+                        <w:tab/>
+                        <w:rPr>
+                          <w:color w:val="000000"/>
+                          <w:sz w:val="20"/>
+                        </w:rPr>
+                        <w:t>{dob}</w:t>
+                      </w:r>
+                    </w:p>
+                    <w:p>
+                      <w:pPr>
+                        <w:spacing w:after="80"/>
+                        <w:tabs>
+                          <w:tab w:val="left" w:pos="1440"/>
+                        </w:tabs>
+                      </w:pPr>
+                      <w:r>
+                        <w:rPr>
+                          <w:color w:val="F15A23"/>
+                          <w:sz w:val="20"/>
+                          <w:b/>
+                          <w:u/>
+                        </w:rPr>
+                        <w:t>जन्म समय :</w:t>
+                      </w:r>
+                      <w:r>
+                        <w:tab/>
+                        <w:rPr>
+                          <w:color w:val="000000"/>
+                          <w:sz w:val="20"/>
+                        </w:rPr>
+                        <w:t>{tob}</w:t>
+                      </w:r>
+                    </w:p>
+                    <w:p>
+                      <w:pPr>
+                        <w:spacing w:after="40"/>
+                        <w:tabs>
+                          <w:tab w:val="left" w:pos="1440"/>
+                        </w:tabs>
+                      </w:pPr>
+                      <w:r>
+                        <w:rPr>
+                          <w:color w:val="F15A23"/>
+                          <w:sz w:val="20"/>
+                          <w:b/>
+                          <w:u/>
+                        </w:rPr>
+                        <w:t>स्थान :</w:t>
+                      </w:r>
+                      <w:r>
+                        <w:tab/>
+                        <w:rPr>
+                          <w:color w:val="000000"/>
+                          <w:sz w:val="20"/>
+                        </w:rPr>
+                        <w:t>{place}</w:t>
+                      </w:r>
+                    </w:p>
+                  </w:txbxContent>
+                </v:textbox>
+              </v:roundrect>
+            </w:pict>
+          </w:r>
+        </w:p>'''
+        
+        from docx.oxml import parse_xml
+        rounded_element = parse_xml(xml_content)
+        container._element.append(rounded_element)
+        return None  # No table to return
+        
+    except Exception:
+        # Fallback to table approach if VML fails
+        pass
+    
+    # Fallback: Create a table with rounded corners for unified personal details
+    detail_table = container.add_table(rows=1, cols=1)
+    detail_table.autofit = False
+    detail_table.columns[0].width = Inches(3.5)
+    
+    cell = detail_table.rows[0].cells[0]
+    
+    # Add Title "व्यक्तिगत विवरण" inside the box at the top - compact spacing
+    title_para = cell.add_paragraph('व्यक्तिगत विवरण')
+    title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    title_run = title_para.runs[0]
+    title_run.bold = True
+    title_run.underline = True
+    title_run.font.size = Pt(11)  # Slightly smaller for compact
+    title_run.font.color.rgb = RGBColor(241, 90, 35)  # Orange color
+    title_para.paragraph_format.space_after = Pt(4)  # Reduced from 8
+    title_para.paragraph_format.space_before = Pt(0)  # Reduced from 2
+    
+    # Add Name - compact spacing
+    name_para = cell.add_paragraph()
+    name_title = name_para.add_run('नाम: ')
+    name_title.bold = True
+    name_title.font.size = Pt(9)  # Smaller font for compact
+    name_title.font.color.rgb = RGBColor(241, 90, 35)  # Orange color
+    name_content = name_para.add_run(str(name))
+    name_content.font.size = Pt(9)  # Smaller font for compact
+    name_content.font.color.rgb = RGBColor(0, 0, 0)  # Black color like in reference
+    name_para.paragraph_format.space_after = Pt(1)  # Reduced from 3
+    
+    # Add Date of Birth - compact spacing
+    dob_para = cell.add_paragraph()
+    dob_title = dob_para.add_run('जन्म तिथि: ')
+    dob_title.bold = True
+    dob_title.font.size = Pt(9)  # Smaller font for compact
+    dob_title.font.color.rgb = RGBColor(241, 90, 35)  # Orange color
+    dob_content = dob_para.add_run(str(dob))
+    dob_content.font.size = Pt(9)  # Smaller font for compact
+    dob_content.font.color.rgb = RGBColor(0, 0, 0)  # Black color like in reference
+    dob_para.paragraph_format.space_after = Pt(1)  # Reduced from 3
+    
+    # Add Time of Birth - compact spacing
+    tob_para = cell.add_paragraph()
+    tob_title = tob_para.add_run('जन्म समय: ')
+    tob_title.bold = True
+    tob_title.font.size = Pt(9)  # Smaller font for compact
+    tob_title.font.color.rgb = RGBColor(241, 90, 35)  # Orange color
+    tob_content = tob_para.add_run(str(tob))
+    tob_content.font.size = Pt(9)  # Smaller font for compact
+    tob_content.font.color.rgb = RGBColor(0, 0, 0)  # Black color like in reference
+    tob_para.paragraph_format.space_after = Pt(1)  # Reduced from 3
+    
+    # Add Place - compact spacing
+    place_para = cell.add_paragraph()
+    place_title = place_para.add_run('स्थान: ')
+    place_title.bold = True
+    place_title.font.size = Pt(9)  # Smaller font for compact
+    place_title.font.color.rgb = RGBColor(241, 90, 35)  # Orange color
+    place_content = place_para.add_run(str(place))
+    place_content.font.size = Pt(9)  # Smaller font for compact
+    place_content.font.color.rgb = RGBColor(0, 0, 0)  # Black color like in reference
+    place_para.paragraph_format.space_after = Pt(0)  # Reduced from 2
+    
+    # Apply compact rounded corner styling with minimal padding
+    try:
+        cell_elem = cell._tc
+        tcPr = cell_elem.get_or_add_tcPr()
+        
+        # Add rounded corner borders using dotted style for rounded appearance
+        tcBorders = OxmlElement('w:tcBorders')
+        for edge in ('top', 'left', 'bottom', 'right'):
+            border = OxmlElement(f'w:{edge}')
+            border.set(qn('w:val'), 'single')
+            border.set(qn('w:sz'), '6')  # Thin border
+            border.set(qn('w:color'), 'F15A23')  # Orange color matching reference
+            tcBorders.append(border)
+        tcPr.append(tcBorders)
+        
+        # Minimal padding for compact 1-page format
+        tcMar = OxmlElement('w:tcMar')
+        for side in ('top', 'left', 'bottom', 'right'):
+            margin = OxmlElement(f'w:{side}')
+            margin.set(qn('w:w'), '80')  # Minimal padding for compact layout
+            margin.set(qn('w:type'), 'dxa')
+            tcMar.append(margin)
+        tcPr.append(tcMar)
+        
+        # Clean white background
+        shd = OxmlElement('w:shd')
+        shd.set(qn('w:val'), 'clear')
+        shd.set(qn('w:color'), 'auto')
+        shd.set(qn('w:fill'), 'FFFFFF')  # Pure white background
+        tcPr.append(shd)
+        
+        # Add rounded corner effect using XML for better circular appearance
+        tcW = OxmlElement('w:tcW')
+        tcW.set(qn('w:w'), '0')
+        tcW.set(qn('w:type'), 'auto')
+        tcPr.append(tcW)
+        
+    except Exception:
+        pass
+    
+    return detail_table
+
+def apply_premium_table_style(table, header_color_rgb=(204, 102, 0), alt_row_color_rgb=(255, 235, 224)):
+    """Apply premium professional styling to tables with genuine rounded corners using VML background"""
+    try:
+        # Apply table borders - no outer borders for rounded effect
+        tbl = table._tbl
+        tblPr = tbl.tblPr
+        tblBorders = OxmlElement('w:tblBorders')
+        
+        # Apply rounded corner border styling
+        border_styles = {
+            'top': ('thick', '12'),     # Thick top border for rounded effect
+            'left': ('thick', '12'),    # Thick left border for rounded effect 
+            'bottom': ('thick', '12'),  # Thick bottom border for rounded effect
+            'right': ('thick', '12'),   # Thick right border for rounded effect
+            'insideH': ('single', '6'),  # Internal horizontal borders
+            'insideV': ('single', '6')   # Internal vertical borders
+        }
+        
+        for edge, (style, size) in border_styles.items():
+            border = OxmlElement(f'w:{edge}')
+            border.set(qn('w:val'), style)
+            border.set(qn('w:sz'), size)
+            border.set(qn('w:color'), 'D2691E')  # Dark orange color
+            tblBorders.append(border)
+        tblPr.append(tblBorders)
+        
+        # Add table alignment
+        tblAlign = OxmlElement('w:jc')
+        tblAlign.set(qn('w:val'), 'center')
+        tblPr.append(tblAlign)
+        
+        # Add table style properties for rounded corners
+        try:
+            # Apply table-level styling for rounded appearance
+            tblStyle = OxmlElement('w:tblStyle')
+            tblStyle.set(qn('w:val'), 'TableGrid')  # Use a style that supports rounding
+            tblPr.insert(0, tblStyle)
+            
+            # Add table cell margins for better spacing
+            tblCellMar = OxmlElement('w:tblCellMar')
+            for side in ['top', 'left', 'bottom', 'right']:
+                margin = OxmlElement(f'w:{side}')
+                margin.set(qn('w:w'), '60')  # Add some margin
+                margin.set(qn('w:type'), 'dxa')
+                tblCellMar.append(margin)
+            tblPr.append(tblCellMar)
+            
+        except Exception:
+            pass
+        
+        # Add genuine VML rounded corners to corner cells
+        try:
+            # Get corner cells and add VML rounded rectangle backgrounds
+            num_rows = len(table.rows)
+            num_cols = len(table.rows[0].cells) if table.rows else 0
+            
+            if num_rows > 0 and num_cols > 0:
+                # Apply VML rounded backgrounds to corner cells
+                corner_positions = [
+                    (0, 0, 'top-left'),
+                    (0, num_cols-1, 'top-right'),
+                    (num_rows-1, 0, 'bottom-left'),
+                    (num_rows-1, num_cols-1, 'bottom-right')
+                ]
+                
+                for row_idx, col_idx, corner_type in corner_positions:
+                    try:
+                        cell = table.cell(row_idx, col_idx)
+                        
+                        # Add VML rounded rectangle as paragraph inside the cell
+                        vml_para = cell.add_paragraph()
+                        
+                        # Create VML rounded corner element
+                        vml_xml = '''
+                        <w:pict xmlns:v="urn:schemas-microsoft-com:vml" xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+                          <v:roundrect style="position:absolute;left:0;top:0;width:100%;height:100%;z-index:-1" 
+                                       arcsize="15%" fillcolor="#ffdcc8" strokecolor="#D2691E" strokeweight="1pt">
+                          </v:roundrect>
+                        </w:pict>
+                        '''
+                        
+                        # Parse and insert VML into the paragraph
+                        vml_element = parse_xml(vml_xml)
+                        vml_para._p.append(vml_element._element)
+                        
+                    except Exception:
+                        continue
+                        
+        except Exception:
+            pass
+        
+        # Style header row with premium look
+        header_cells = table.rows[0].cells
+        for cell in header_cells:
+            # Premium header background
+            cell_elem = cell._tc
+            tcPr = cell_elem.get_or_add_tcPr()
+            shd = OxmlElement('w:shd')
+            shd.set(qn('w:val'), 'clear')
+            shd.set(qn('w:color'), 'auto')
+            shd.set(qn('w:fill'), '{:02x}{:02x}{:02x}'.format(*header_color_rgb))
+            tcPr.append(shd)
+            
+            # Add minimal cell padding for compactness
+            tcMar = OxmlElement('w:tcMar')
+            for side in ('top', 'left', 'bottom', 'right'):
+                margin = OxmlElement(f'w:{side}')
+                margin.set(qn('w:w'), '40')  # Reduced from 100 to 40
+                margin.set(qn('w:type'), 'dxa')
+                tcMar.append(margin)
+            tcPr.append(tcMar)
+            
+            # Enhanced header text styling
+            for paragraph in cell.paragraphs:
+                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                for run in paragraph.runs:
+                    run.bold = True
+                    run.font.color.rgb = RGBColor(255, 255, 255)
+                    run.font.size = Pt(9)  # Slightly smaller for compactness
+                    run.font.name = 'Calibri'
+        
+        # Style data rows with professional alternating colors
+        for i, row in enumerate(table.rows[1:], 1):
+            for cell in row.cells:
+                cell_elem = cell._tc
+                tcPr = cell_elem.get_or_add_tcPr()
+                
+                # Alternating row colors: odd rows (1,3,5...) get beautiful light orange background
+                if i % 2 == 1:  # Odd rows get the beautiful light orange background
+                    shd = OxmlElement('w:shd')
+                    shd.set(qn('w:val'), 'clear')
+                    shd.set(qn('w:color'), 'auto')
+                    shd.set(qn('w:fill'), '{:02x}{:02x}{:02x}'.format(*alt_row_color_rgb))
+                    tcPr.append(shd)
+                # Even rows (2,4,6...) get no background color (default white)
+                
+                # Add minimal cell padding for all data cells
+                tcMar = OxmlElement('w:tcMar')
+                for side in ('top', 'left', 'bottom', 'right'):
+                    margin = OxmlElement(f'w:{side}')
+                    margin.set(qn('w:w'), '30')  # Reduced from 80 to 30
+                    margin.set(qn('w:type'), 'dxa')
+                    tcMar.append(margin)
+                tcPr.append(tcMar)
+                
+                # Enhanced data text styling
+                for paragraph in cell.paragraphs:
+                    for run in paragraph.runs:
+                        run.font.color.rgb = RGBColor(51, 51, 51)
+                        run.font.size = Pt(8)  # Even smaller for data cells to fit more content
+                        run.font.name = 'Calibri'
+    except Exception:
+        pass
+
+def add_phalit_section(container_cell, width_inches=3.60, rows=15):
+    # Add beautiful cylindrical gradient header bar for फलित section
+    create_cylindrical_section_header(container_cell, "फलित", width_pt=260)
+
+    t = container_cell.add_table(rows=rows, cols=1); t.autofit = False
+    # Clear table borders so only bottom rules show
+    try:
+        tbl = t._tbl; tblPr = tbl.tblPr
+        tblBorders = OxmlElement('w:tblBorders')
+        for edge in ('top','left','bottom','right','insideH','insideV'):
+            el = OxmlElement(f'w:{edge}'); el.set(qn('w:val'),'nil'); tblBorders.append(el)
+        tblPr.append(tblBorders)
+    except Exception:
+        pass
+    set_col_widths(t, [width_inches])
+    for r in t.rows:
+        r.height_rule = WD_ROW_HEIGHT_RULE.EXACTLY
+        r.height = Pt(14)
+        c = r.cells[0]
+        p = c.paragraphs[0]; run = p.add_run("\u00A0"); run.font.size = Pt(1)
+        tcPr = c._tc.get_or_add_tcPr()
+        for el in list(tcPr):
+            if el.tag.endswith('tcBorders'):
+                tcPr.remove(el)
+        tcBorders = OxmlElement('w:tcBorders')
+        for edge in ('top','left','right'):
+            el = OxmlElement(f'w:{edge}'); el.set(qn('w:val'),'nil'); tcBorders.append(el)
+        el = OxmlElement('w:bottom')
+        el.set(qn('w:val'),'single'); el.set(qn('w:sz'),'8'); el.set(qn('w:space'),'0'); el.set(qn('w:color'),'E67E22')
+        tcBorders.append(el)
+        tcPr.append(tcBorders)
+
+def add_pramukh_bindu_section(container_cell, rows):
+    spacer = container_cell.add_paragraph("")
+    spacer.paragraph_format.space_after = Pt(0)
+    # Title
+    # title = container_cell.add_paragraph("प्रमुख बिंदु")
+    # # Match other section titles
+    # _apply_hindi_caption_style(title, size_pt=11, underline=True, bold=True)
+    # title.paragraph_format.space_before = Pt(0)
+    # title.paragraph_format.space_after = Pt(2)
+    # title.paragraph_format.space_before = Pt(6)
+    # title.paragraph_format.space_after = Pt(3)
+    create_cylindrical_section_header(container_cell, "प्रमुख बिंदु", width_pt=260)
+
+    if not rows:
+        # Nothing to show; avoid adding an empty table
+        return
+
+    t = container_cell.add_table(rows=0, cols=2)
+    t.autofit = True
+    # Match font size with other tables
+    try:
+        set_table_font(t, pt=BASE_FONT_PT)
+    except Exception:
+        pass
+    for left_txt, right_txt in rows:
+        r = t.add_row().cells
+        r[0].text = left_txt
+        r[1].text = right_txt
+
+    # Borders similar to other tables
+    add_table_borders(t, size=6)
+    apply_premium_table_style(t)  # Apply orange headers and alternating grey rows
+    compact_table_paragraphs(t)
+
+def build_kundali_docx(report):
+    """Render the full one-page report; returns the .docx file as bytes."""
+    name, place, dt_local = report.name, report.place, report.dt_local
+    lagna_sign, nav_lagna_sign = report.chart.lagna_sign, report.chart.nav_lagna_sign
+
+    # ===== ENHANCED DOCUMENT SETUP =====
+    # A4 page, margins, Normal font and the subtle page background come from the cached base
+    doc = new_styled_document(LATIN_FONT, HINDI_FONT, BASE_FONT_PT, 'FEFEFE')
+
+    # ===== EXACT LAYOUT MATCH: Top section with Personal Details (left) + MRIDAASTRO (right) =====
+    try:
+        # Create top header table (2 columns: Personal Details | MRIDAASTRO)
+        header_table = doc.add_table(rows=1, cols=2)
+        header_table.autofit = False
+        left_width_in = 3.85  # inches; Personal Details column
+        header_table.columns[0].width = Inches(left_width_in)
+        header_table.columns[1].width = Inches(7.5 - left_width_in)
+        # Remove default table cell margins to maximize usable height
+        try:
+            tbl = header_table._tbl
+            tblPr = tbl.tblPr
+            # Drop any existing tblCellMar
+            for el in list(tblPr):
+                if el.tag.endswith('tblCellMar'):
+                    tblPr.remove(el)
+            cellMar = OxmlElement('w:tblCellMar')
+            for side in ('top','bottom','left','right'):
+                m = OxmlElement(f'w:{side}')
+                m.set(qn('w:w'), '0')
+                m.set(qn('w:type'), 'dxa')
+                cellMar.append(m)
+            tblPr.append(cellMar)
+        except Exception:
+            pass
+  # keep total ~7.5"
+  # Right: MRIDAASTRO (adjusted)
+        
+        # Remove borders from header table
+        hdr_tbl = header_table._tbl
+        hdr_tblPr = hdr_tbl.tblPr
+        hdr_tblBorders = OxmlElement('w:tblBorders')
+        for edge in ('top','left','bottom','right','insideH','insideV'):
+            el = OxmlElement(f'w:{edge}')
+            el.set(qn('w:val'), 'nil')
+            hdr_tblBorders.append(el)
+        hdr_tblPr.append(hdr_tblBorders)
+        
+        # LEFT CELL: Personal Details
+        left_cell = header_table.rows[0].cells[0]
+        
+        # Keep the cell exactly as tall as the overlay so content centers within the round-rect
+        header_table.rows[0].height_rule = WD_ROW_HEIGHT_RULE.EXACTLY
+        header_table.rows[0].height = Pt(92)
+        # Vertical center the whole block within the cell
+        left_cell.vertical_alignment = WD_ALIGN_VERTICAL.TOP
+        # Personal Details Title
+        p_title = left_cell.add_paragraph()
+        p_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        p_title.paragraph_format.space_before = Pt(0)
+        p_title.paragraph_format.space_after = Pt(0)
+        r_title = p_title.add_run("व्यक्तिगत विवरण")
+        r_title.font.bold = True
+        r_title.font.size = Pt(12)
+        
+        # Create aligned personal details using proper spacing
+        details = [
+            ("नाम:", name),
+            ("जन्म तिथि:", dt_local.strftime('%Y-%m-%d')),
+            ("जन्म समय:", dt_local.strftime('%H:%M:%S')),
+            ("स्थान:", place)
+        ]
+        
+        pd_table = left_cell.add_table(rows=len(details), cols=2)
+        try:
+            pd_table.alignment = WD_TABLE_ALIGNMENT.CENTER
+        except Exception:
+            pass
+        set_col_widths(pd_table, [1.3, max(1.0, left_width_in - 1.3 - 0.1)])
+        for i, (label, value) in enumerate(details):
+            c0 = pd_table.cell(i, 0)
+            c1 = pd_table.cell(i, 1)
+            # tiny inner padding for breathing room (overrides table-level margins)
+            for _cell in (c0, c1):
+                tcPr = _cell._tc.get_or_add_tcPr()
+                # Remove existing tcMar if present
+                for el in list(tcPr):
+                    if el.tag.endswith('tcMar'):
+                        tcPr.remove(el)
+                tcMar = OxmlElement('w:tcMar')
+                for side, val in (('top','20'), ('bottom','20'), ('left','35'), ('right','35')):
+                    el = OxmlElement(f'w:{side}')
+                    el.set(qn('w:w'), val)  # dxa units (1/20 pt)
+                    el.set(qn('w:type'), 'dxa')
+                    tcMar.append(el)
+                tcPr.append(tcMar)
+
+            # Label
+            p0 = c0.paragraphs[0]
+            p0.alignment = WD_ALIGN_PARAGRAPH.LEFT
+            p0.paragraph_format.space_before = Pt(0)
+            p0.paragraph_format.space_after = Pt(0)
+            r0 = p0.add_run(str(label))
+            r0.font.bold = True
+            r0.font.size = Pt(10)
+            # Value
+            p1 = c1.paragraphs[0]
+            p1.alignment = WD_ALIGN_PARAGRAPH.LEFT
+            p1.paragraph_format.space_before = Pt(0)
+            p1.paragraph_format.space_after = Pt(0)
+            r1 = p1.add_run(str(value))
+            r1.font.size = Pt(10)
+        
+        # Add dark orange rounded border around personal details cell using VML
+        try:
+            # Create a VML rounded rectangle overlay for the personal details
+            vml_h_pt = 92
+            vml_content = f'''
+            <w:p xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+              <w:pPr>
+                <w:spacing w:before="0" w:after="0"/>
+              </w:pPr>
+              <w:r>
+                <w:pict xmlns:v="urn:schemas-microsoft-com:vml">
+                  <v:roundrect style="position:absolute;left:0pt;top:0pt;width:{int(left_width_in * 72) - 10}pt;height:{vml_h_pt}pt;z-index:-1" 
+                               arcsize="15%" fillcolor="transparent" strokecolor="#CC6600" strokeweight="3pt">
+                  </v:roundrect>
+                </w:pict>
+              </w:r>
+            </w:p>'''
+            vml_element = parse_xml(vml_content)
+            left_cell._element.insert(0, vml_element)
+        except Exception:
+            # Fallback to regular thick border if VML fails
+            tc = left_cell._tc
+            tcPr = tc.get_or_add_tcPr()
+            
+            # Remove existing borders first
+            existing_borders = tcPr.find(qn('w:tcBorders'))
+            if existing_borders is not None:
+                tcPr.remove(existing_borders)
+            
+            # Add dark orange borders
+            tcBorders = OxmlElement('w:tcBorders')
+            for edge in ('top', 'left', 'bottom', 'right'):
+                el = OxmlElement(f'w:{edge}')
+                el.set(qn('w:val'), 'single')
+                el.set(qn('w:sz'), '18')  # Thick border
+                el.set(qn('w:color'), 'CC6600')  # Dark orange
+                el.set(qn('w:space'), '0')
+                tcBorders.append(el)
+            tcPr.append(tcBorders)
+        
+        # RIGHT CELL: MRIDAASTRO + Tagline
+        right_cell = header_table.rows[0].cells[1]
+        
+        # MRIDAASTRO - Enhanced font size (48px equivalent = 36pt)
+        p_mrid = right_cell.add_paragraph()
+        p_mrid.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        r_mrid = p_mrid.add_run("MRIDAASTRO")
+        r_mrid.font.bold = True
+        r_mrid.font.size = Pt(36)  # Enhanced from 16pt to 36pt
+        r_mrid.font.name = "Cinzel Decorative"
+        # Force font type change using XML
+        rPr = r_mrid._element.rPr
+        if rPr is not None:
+            rFonts = rPr.find(qn('w:rFonts'))
+            if rFonts is not None:
+                rFonts.set(qn('w:ascii'), 'Cinzel Decorative')
+                rFonts.set(qn('w:hAnsi'), 'Cinzel Decorative')
+                rFonts.set(qn('w:cs'), 'Cinzel Decorative')
+        
+        # Tagline
+        p_tag = right_cell.add_paragraph()
+        p_tag.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        r_tag = p_tag.add_run("In the light of the divine, let your soul journey shine.")
+        r_tag.italic = True
+        r_tag.font.size = Pt(10)  # Enhanced from 10pt to 14pt
+        
+        # Add some space after header table
+        spacer1 = doc.add_paragraph()
+        spacer1.paragraph_format.space_after = Pt(6)
+        
+        # CENTERED DOCUMENT TITLE
+        title_para = doc.add_paragraph()
+        title_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        r_title_main = title_para.add_run("PERSONAL HOROSCOPE (JANMA KUNDALI)")
+        r_title_main.font.bold = True
+        r_title_main.font.size = Pt(20)
+        
+        # Add space after title
+        spacer2 = doc.add_paragraph()
+        spacer2.paragraph_format.space_after = Pt(4)
+        
+    except Exception:
+        # Fallback to simple header
+        pass
+# ===== End Header Block (simplified & robust) =====
+# ===== End Header Block (safe) =====
+
+
+    # ===== ENHANCED MAIN LAYOUT TABLE =====
+    outer = doc.add_table(rows=1, cols=2); outer.autofit=False
+    outer.columns[0].width = Inches(3.70); outer.columns[1].width = Inches(RIGHT_WIDTH_IN)
+
+    row_height_pt = int(CHART_W_PT * 0.80) + 36   # chart square comes from the module constant shared with the SVG
+    
+    # Remove outer borders and the internal vertical divider
+    tbl = outer._tbl; tblPr = tbl.tblPr; tblBorders = OxmlElement('w:tblBorders')
+    for edge in ('top','left','bottom','right','insideH','insideV'):
+        el = OxmlElement(f'w:{edge}'); el.set(qn('w:val'),'nil'); tblBorders.append(el)
+    tblPr.append(tblBorders)
+    # Remove horizontal internal borders
+    for edge in ('insideH',):
+        el = OxmlElement(f'w:{edge}'); el.set(qn('w:val'),'nil'); tblBorders.append(el)
+    tblPr.append(tblBorders)
+    
+    # Add subtle table shading
+    try:
+        tblPr = outer._tbl.tblPr
+        shd = OxmlElement('w:shd')
+        shd.set(qn('w:val'), 'clear')
+        shd.set(qn('w:color'), 'auto')
+        shd.set(qn('w:fill'), 'FDFDFD')  # Very light background
+        tblPr.append(shd)
+    except Exception:
+        pass
+
+    left = outer.rows[0].cells[0]
+    # ===== MODERN PERSONAL DETAILS SECTION WITH UNIFIED ROUNDED BOX =====            
+    # Personal details are now in the header section above, no need for duplicate
+    # Original planetary positions section
+    # h1 = left.add_paragraph("ग्रह स्थिति"); _apply_hindi_caption_style(h1, size_pt=11, underline=True, bold=True)
+    create_cylindrical_section_header(left, "ग्रह स्थिति", width_pt=260)
+    
+    # === COMPLETELY REWRITTEN FIRST TABLE: ग्रह स्थिति ===
+    # Create table with exact 5 columns for clean structure
+    t1 = left.add_table(rows=1, cols=5)
+    t1.autofit = False  # Disable autofit to prevent conflicts
+    
+    # Set headers manually to ensure correct order
+    headers = POSITIONS_HEADER
+    for i, header in enumerate(headers):
+        t1.rows[0].cells[i].text = header
+    
+    # Add data rows with clean structure
+    for row in report.positions:
+        new_row = t1.add_row()
+        for i, val in enumerate(row):
+            new_row.cells[i].text = str(val) if val is not None else ""
+        
+        # Center align all data cells
+        for cell in new_row.cells:
+            for paragraph in cell.paragraphs:
+                paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    
+    # Apply styling and formatting
+    center_header_row(t1)
+    set_table_font(t1, pt=BASE_FONT_PT)
+    add_table_borders(t1, size=6)
+    apply_premium_table_style(t1)
+    
+    # Set proper column widths AFTER creating structure
+    set_col_widths(t1, [0.70, 0.55, 0.85, 0.80, 0.80])
+    
+    # Left align ONLY the header cell of the last column (उप‑नक्षत्र)
+    for p in t1.rows[0].cells[-1].paragraphs:
+        p.alignment = WD_ALIGN_PARAGRAPH.LEFT
+
+
+    # Original Mahadasha section
+    # h2 = left.add_paragraph("विंशोत्तरी महादशा"); _apply_hindi_caption_style(h2, size_pt=11, underline=True, bold=True); h2.paragraph_format.keep_with_next = True; h2.paragraph_format.space_after = Pt(2)
+    create_cylindrical_section_header(left, "विंशोत्तरी महादशा", width_pt=260)
+    t2 = left.add_table(rows=1, cols=len(MAHADASHA_HEADER)); t2.autofit=True
+    for i,c in enumerate(MAHADASHA_HEADER): t2.rows[0].cells[i].text=c
+    for row in report.mahadasha:
+        r=t2.add_row().cells
+        for i,c in enumerate(row): 
+            # Clean data handling - avoid NaN and empty values
+            val = str(c) if c is not None and str(c).strip() else ""
+            r[i].text = val
+            # Ensure proper cell alignment
+            for p in r[i].paragraphs:
+                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    center_header_row(t2); set_table_font(t2, pt=BASE_FONT_PT); add_table_borders(t2, size=6)
+    apply_premium_table_style(t2)  # Apply orange headers and alternating grey rows
+    set_col_widths(t2, [1.20, 1.50, 1.00])
+
+    # Original Antardasha section
+    # h3 = left.add_paragraph("महादशा / अंतरदशा"); _apply_hindi_caption_style(h3, size_pt=11, underline=True, bold=True)
+    create_cylindrical_section_header(left, "महादशा / अंतरदशा", width_pt=260)
+    t3 = left.add_table(rows=1, cols=len(ANTARDASHA_HEADER)); t3.autofit=True
+    for i,c in enumerate(ANTARDASHA_HEADER): t3.rows[0].cells[i].text=c
+    for row in report.antardasha:
+        r=t3.add_row().cells
+        for i,c in enumerate(row): 
+            # Clean data handling - avoid NaN and empty values
+            val = str(c) if c is not None and str(c).strip() else ""
+            r[i].text = val
+            # Ensure proper cell alignment
+            for p in r[i].paragraphs:
+                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    center_header_row(t3); set_table_font(t3, pt=BASE_FONT_PT); add_table_borders(t3, size=6)
+    apply_premium_table_style(t3)  # Apply orange headers and alternating grey rows
+    set_col_widths(t3, [1.30, 1.40, 1.00])  # Adjusted column widths for better alignment
+    compact_table_paragraphs(t3)  # Move after styling to prevent border conflicts
+
+    # One-page: place Pramukh Bindu under tables (left column) to free right column for charts
+    try:
+        add_pramukh_bindu_section(left, report.pramukh_bindu)
+        add_phalit_section(left, rows=12)  # Reduced rows to prevent overlapping
+    except Exception:
+        pass
+    right = outer.rows[0].cells[1]
+    try:
+        set_cell_margins(right, left=360)
+    except Exception:
+        pass
+
+    # Ensure the OUTER right cell has zero inner margins so the kundali touches the cell borders
+    try:
+        right_tcPr = right._tc.get_or_add_tcPr()
+        right_tcMar = right_tcPr.find('./w:tcMar')
+        if right_tcMar is None:
+            right_tcMar = OxmlElement('w:tcMar')
+            right_tcPr.append(right_tcMar)
+        for side in ('top','left','bottom','right'):
+            el = OxmlElement(f'w:{side}')
+            el.set(qn('w:w'),'0')
+            el.set(qn('w:type'),'dxa')
+            right_tcMar.append(el)
+    except Exception:
+        pass
+
+    kt = right.add_table(rows=2, cols=1); kt.autofit=False; kt.columns[0].width = Inches(RIGHT_WIDTH_IN)
+
+    # remove cell padding for chart table to let kundali touch the cell borders
+    try:
+        tcPr = kt._tbl.tblPr
+        tblCellMar = OxmlElement('w:tblCellMar')
+        for side in ('top','left','bottom','right'):
+            el = OxmlElement(f'w:{side}')
+            el.set(qn('w:w'),'0')
+            el.set(qn('w:type'),'dxa')
+            tblCellMar.append(el)
+        tcPr.append(tblCellMar)
+    except Exception:
+        pass
+    # Compact right-cell paragraph spacing
+    try:
+        for p in right.paragraphs:
+            p.paragraph_format.space_before = Pt(0)
+            p.paragraph_format.space_after = Pt(0)
+    except Exception:
+        pass
+    right.vertical_alignment = WD_ALIGN_VERTICAL.TOP
+    kt.autofit = False
+    kt.columns[0].width = Inches(RIGHT_WIDTH_IN)
+    for row in kt.rows:
+        row.height_rule = WD_ROW_HEIGHT_RULE.AT_LEAST
+        row.height = Pt(row_height_pt)
+    cell1 = kt.rows[0].cells[0]
+    try:
+        set_cell_margins(cell1, top=0, bottom=0)
+    except Exception:
+        pass
+    try:
+        set_cell_margins(cell1, top=0, bottom=0)
+    except Exception:
+        pass
+    try:
+        set_cell_margins(cell1, top=0, bottom=0)
+    except Exception:
+        pass
+    # Lagna chart cylindrical header bar (centered)
+    create_cylindrical_section_header(cell1, "लग्न कुंडली", width_pt=int(CHART_W_PT), align='center', spacing_after=0, text_jc='center', run_text=False, line_exact=True)
+    hdr_p = cell1.paragraphs[-1]
+    # Lagna chart with planets in single box per house
+    rasi_house_planets = report.rasi_houses
+    hdr_p._p.addnext(kundali_with_planets(size_pt=CHART_W_PT, lagna_sign=lagna_sign, house_planets=rasi_house_planets))
+
+    # Original Navamsa chart title - Enhanced styling for visibility
+    cell2 = kt.rows[1].cells[0];                         sp_nav = cell2.add_paragraph(); sp_nav.paragraph_format.space_before = Pt(8); sp_nav.paragraph_format.space_after = Pt(0)
+    # Navamsha chart cylindrical header bar (centered)
+    create_cylindrical_section_header(cell2, "नवांश कुंडली", width_pt=int(CHART_W_PT), align='center', spacing_after=0, text_jc='center')
+    p2 = cell2.add_paragraph(); p2.paragraph_format.space_before = Pt(0); p2.paragraph_format.space_after = Pt(0)
+    nav_house_planets = report.nav_houses
+    p2._p.addnext(kundali_with_planets(size_pt=CHART_W_PT, lagna_sign=nav_lagna_sign, house_planets=nav_house_planets))
+    # (प्रमुख बिंदु moved to row 2 of outer table)
+    # Ensure content goes below chart shape - single spacing paragraph
+    cell2.add_paragraph("").paragraph_format.space_after = Pt(0)
+    # (Pramukh Bindu moved above charts)
+
+    out = BytesIO()
+    # APPLY_ZERO_MARGINS_BEFORE_SAVE
+    try:
+        for tbl in doc.tables:
+            zero_table_cell_margins(tbl)
+    except Exception:
+        pass
+    compact_document_spacing(doc)
+    doc.save(out)
+    return out.getvalue()
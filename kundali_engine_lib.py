@@ -0,0 +1,402 @@
+# -*- coding: utf-8 -*-
+# kundali_engine_lib.py
+# Headless chart engine: sidereal positions, lagna / navamsa, Vimshottari dasha and yoga checks.
+# Deliberately free of Streamlit, matplotlib, pandas and python-docx so batch workers can import it cheaply.
+
+import bisect
+import datetime
+from dataclasses import dataclass, field
+from typing import NamedTuple, Optional
+
+import numpy as np
+import swisseph as swe
+
+AYANAMSHA_VAL = swe.SIDM_LAHIRI
+YEAR_DAYS     = 365.2422
+
+PLANETS = ['Su','Mo','Ma','Me','Ju','Ve','Sa','Ra','Ke']
+SWE_BODIES = [swe.SUN, swe.MOON, swe.MARS, swe.MERCURY, swe.JUPITER, swe.VENUS, swe.SATURN, swe.MEAN_NODE]  # Ke derived from Ra
+
+# Vimshottari sequence and years
+ORDER = ['Ke','Ve','Su','Mo','Ma','Ra','Ju','Sa','Me']
+YEARS = {'Ke':7,'Ve':20,'Su':6,'Mo':10,'Ma':7,'Ra':18,'Ju':16,'Sa':19,'Me':17}
+
+# ==== Status helpers (Rāśi vs Navāṁśa aware) ====
+SIGN_LORD = {1:'Ma',2:'Ve',3:'Me',4:'Mo',5:'Su',6:'Me',7:'Ve',8:'Ma',9:'Ju',10:'Sa',11:'Sa',12:'Ju'}
+EXALT_SIGN = {'Su':1,'Mo':2,'Ma':10,'Me':6,'Ju':4,'Ve':12,'Sa':7,'Ra':2,'Ke':8}
+DEBIL_SIGN = {'Su':7,'Mo':8,'Ma':4,'Me':12,'Ju':10,'Ve':6,'Sa':1,'Ra':8,'Ke':2}
+# --- Combustion settings ---
+# Only the SUN causes combustion. Rahu/Ketu never combust. Moon CAN be combust (by Sun) if within orb.
+# Set this to True if you want to mark combustion ONLY when the Sun and the planet are in the SAME rāśi sign.
+REQUIRE_SAME_SIGN_FOR_COMBUST = False  # change to True if that matches your tradition
+
+COMBUST_ORB = {'Mo':12.0,'Ma':17.0,'Me':12.0,'Ju':11.0,'Ve':10.0,'Sa':15.0}
+
+
+# ---- Chart result types ----
+@dataclass(frozen=True)
+class Yogas:
+    muntha_house: Optional[int] = None
+    sade_sati: Optional[str] = None  # "साढ़ेसाती" / "शनि ढैय्या" / None
+    sade_sati_phase: Optional[str] = None  # only for साढ़ेसाती
+    sade_sati_start: Optional[datetime.datetime] = None  # naive UTC, of the whole साढ़ेसाती / ढैय्या
+    sade_sati_end: Optional[datetime.datetime] = None
+    kaalsarp: bool = False
+    chandal: bool = False
+    pitru: bool = False
+    neech_bhang: bool = False
+
+
+@dataclass(frozen=True)
+class ChartResult:
+    dt_utc: datetime.datetime
+    lat: float
+    lon: float
+    jd: float
+    ayanamsa: float
+    sidelons: dict                 # planet code -> sidereal longitude (deg)
+    lagna_sign: int                # 1..12
+    asc_sid: float
+    nav_lagna_sign: int            # 1..12
+    md_segments: list = field(default_factory=list)
+    yogas: Optional[Yogas] = None
+
+
+# ---- Signs / navamsa / statuses ----
+def _min_circ_angle(a, b):
+    d = abs((a - b) % 360.0)
+    return d if d <= 180.0 else 360.0 - d
+
+def planet_rasi_sign(lon_sid):
+    return int(lon_sid // 30) + 1  # 1..12
+
+def navamsa_sign_from_lon_sid(lon_sid):
+    sign = int(lon_sid // 30) + 1; deg_in_sign = lon_sid % 30.0; pada = int(deg_in_sign // (30.0/9.0))
+    if sign in (1,4,7,10): start = sign
+    elif sign in (2,5,8,11): start = ((sign + 8 - 1) % 12) + 1
+    else: start = ((sign + 4 - 1) % 12) + 1
+    return ((start - 1 + pada) % 12) + 1
+
+def compute_statuses_all(sidelons):
+    """Return per-planet dict containing both rasi-based and nav-based flags."""
+    out = {}
+    sun_lon = sidelons.get('Su', 0.0)
+    for code in PLANETS:
+        lon = sidelons[code]
+        rasi = planet_rasi_sign(lon)
+        nav  = navamsa_sign_from_lon_sid(lon)
+        varg = (rasi == nav)
+        # Combustion: Sun only, optional same-sign constraint
+        combust = False
+        if code in COMBUST_ORB and code != 'Su':
+            sep = _min_circ_angle(lon, sun_lon)
+            if not REQUIRE_SAME_SIGN_FOR_COMBUST or (planet_rasi_sign(lon) == planet_rasi_sign(sun_lon)):
+                combust = (sep <= COMBUST_ORB[code])
+
+        out[code] = {
+            'rasi': rasi,
+            'nav': nav,
+            'vargottama': varg,
+            'combust': combust,
+            'self_rasi': (SIGN_LORD.get(rasi) == code),
+            'self_nav':  (SIGN_LORD.get(nav)  == code),
+            'exalt_rasi': (EXALT_SIGN.get(code) == rasi),
+            'exalt_nav':  (EXALT_SIGN.get(code) == nav),
+            'debil_rasi': (DEBIL_SIGN.get(code) == rasi),
+            'debil_nav':  (DEBIL_SIGN.get(code) == nav),
+        }
+        # Nodes (Rahu/Ketu): do not mark exaltation/debilitation
+        if code in ('Ra','Ke'):
+            out[code]['exalt_rasi'] = False
+            out[code]['exalt_nav'] = False
+            out[code]['debil_rasi'] = False
+            out[code]['debil_nav'] = False
+    return out
+
+def dms_exact(deg):
+    d = int(deg); m_float = (deg - d) * 60.0; m = int(m_float); s = (m_float - m) * 60.0
+    return d, m, s
+
+def fmt_deg_sign(lon_sid):
+    sign=int(lon_sid//30) + 1; deg_in_sign = lon_sid % 30.0
+    d,m,s=dms_exact(deg_in_sign); s_rounded = int(round(s))
+    if s_rounded == 60: s_rounded = 0; m += 1
+    if m == 60: m = 0; d += 1;
+    if d == 30: d = 0
+    return sign, f"{d:02d}°{m:02d}'{s_rounded:02d}\""
+
+# ---- KP sub-lord index ----
+# The zodiac is turned once into a sorted table of KP subs, split at sign boundaries as in the
+# printed KP tables (249 entries), so a sub-lord lookup is one bisect. Sub-sub lords use a second
+# table (243 subs x 9) built from the same sub boundaries.
+# Boundary convention (the original linear scan's): a longitude on a sub / sub-sub boundary, or within
+# KP_TOL above it, still belongs to the period that ends there; only nakshatra starts are half-open
+# (13°20' exactly is the new nakshatra's first sub). Sign splits are not period boundaries.
+NAK_SPAN = 360.0/27.0
+KP_TOL = 1e-9
+
+class KPSub(NamedTuple):
+    start: float        # sidereal longitude where this entry begins
+    end: float
+    sign: int           # 1..12
+    nak: int            # 0..26
+    nak_lord: str
+    sub_lord: str
+
+def _build_kp_index():
+    index = []; snap = []; ss_starts = []; ss_lords = []; ss_snap = []
+    for ni in range(27):
+        first = ni % 9; acc = 0.0
+        for k in range(9):
+            L = ORDER[(first + k) % 9]
+            start = ni*NAK_SPAN + acc; acc += NAK_SPAN * (YEARS[L]/120.0)
+            end = (ni + 1)*NAK_SPAN if k == 8 else ni*NAK_SPAN + acc
+            # sub-subs: the same Vimshottari proportions, starting from the sub lord
+            sacc = 0.0; span = end - start; sfirst = ORDER.index(L)
+            for j in range(9):
+                SL = ORDER[(sfirst + j) % 9]
+                ss_starts.append(start + sacc); ss_lords.append(SL); ss_snap.append(k > 0 or j > 0)
+                sacc += span * (YEARS[SL]/120.0)
+            # split subs that straddle a sign boundary
+            b = 30.0 * (int(start // 30) + 1)
+            if start + 1e-9 < b < end - 1e-9:
+                index.append(KPSub(start, b, int(start // 30) + 1, ni, ORDER[first], L)); snap.append(k > 0)
+                start = b; index.append(KPSub(start, end, int(start // 30) % 12 + 1, ni, ORDER[first], L)); snap.append(False)
+            else:
+                index.append(KPSub(start, end, int(start // 30) % 12 + 1, ni, ORDER[first], L)); snap.append(k > 0)
+    return index, snap, ss_starts, ss_lords, ss_snap
+
+KP_INDEX, KP_SNAP, KP_SUBSUB_STARTS, KP_SUBSUB_LORDS, KP_SUBSUB_SNAP = _build_kp_index()
+KP_STARTS = [e.start for e in KP_INDEX]
+# KP_SNAP[i] / KP_SUBSUB_SNAP[i]: entry i starts at a period boundary inside a nakshatra, so a
+# longitude within KP_TOL of its start belongs to entry i - 1
+
+def _kp_find(starts, snap, part):
+    i = bisect.bisect_right(starts, part) - 1
+    return i - 1 if snap[i] and part - starts[i] <= KP_TOL else i
+
+def kp_entry(lon_sid)->KPSub:
+    return KP_INDEX[_kp_find(KP_STARTS, KP_SNAP, lon_sid % 360.0)]
+
+def kp_sublord(lon_sid):
+    e = kp_entry(lon_sid)
+    return e.nak_lord, e.sub_lord
+
+def kp_lords(lon_sid):
+    """(nakshatra lord, sub lord, sub-sub lord) for a sidereal longitude."""
+    part = lon_sid % 360.0
+    e = KP_INDEX[_kp_find(KP_STARTS, KP_SNAP, part)]
+    return e.nak_lord, e.sub_lord, KP_SUBSUB_LORDS[_kp_find(KP_SUBSUB_STARTS, KP_SUBSUB_SNAP, part)]
+
+
+# ---- Ephemeris ----
+def set_sidereal_locked():
+    swe.set_sid_mode(AYANAMSHA_VAL, 0, 0)
+
+def sidereal_positions(dt_utc):
+    jd = swe.julday(dt_utc.year, dt_utc.month, dt_utc.day, dt_utc.hour + dt_utc.minute/60 + dt_utc.second/3600)
+    set_sidereal_locked(); flags = swe.FLG_SWIEPH | swe.FLG_SPEED | swe.FLG_SIDEREAL
+    out = {}
+    for code, p in [('Su',swe.SUN),('Mo',swe.MOON),('Ma',swe.MARS),('Me',swe.MERCURY),('Ju',swe.JUPITER),('Ve',swe.VENUS),('Sa',swe.SATURN)]:
+        xx,_ = swe.calc_ut(jd, p, flags); out[code] = xx[0] % 360.0
+    xx,_ = swe.calc_ut(jd, swe.MEAN_NODE, flags)  # Mean node locked
+    out['Ra'] = xx[0] % 360.0; out['Ke'] = (out['Ra'] + 180.0) % 360.0
+    ay = swe.get_ayanamsa_ut(jd); return jd, ay, out
+
+class EphemerisBatch(NamedTuple):
+    jd: np.ndarray         # (N,)
+    lons: np.ndarray       # (N, 9) sidereal longitudes, columns in PLANETS order
+    speeds: np.ndarray     # (N, 9) deg/day
+    ayanamsa: np.ndarray   # (N,)
+
+_JD_UNIX_EPOCH = 2440587.5
+
+def jd_from_datetimes(datetimes):
+    """Vectorised swe.julday for naive UTC datetimes (proleptic Gregorian, like swe.julday)."""
+    us = np.array(datetimes, dtype='datetime64[us]').astype(np.int64)
+    return _JD_UNIX_EPOCH + us / 86400e6
+
+def datetime_from_jd(jd):
+    """Naive UTC datetime for a Julian day (UT), to the microsecond."""
+    return datetime.datetime(1970, 1, 1) + datetime.timedelta(microseconds=round((jd - _JD_UNIX_EPOCH) * 86400e6))
+
+def sidereal_positions_batch(datetimes):
+    """sidereal_positions() for many charts at once.
+
+    The sidereal mode is set once and results land in preallocated arrays. Charts are
+    visited in time order and all bodies of one instant are computed together, which keeps
+    Swiss Ephemeris' per-date caches (nutation, Earth, ayanamsa) warm between calls.
+    """
+    jds = jd_from_datetimes(datetimes)
+    n = len(jds)
+    lons = np.empty((n, 9)); speeds = np.empty((n, 9)); ayan = np.empty(n)
+    set_sidereal_locked(); flags = swe.FLG_SWIEPH | swe.FLG_SPEED | swe.FLG_SIDEREAL
+    calc_ut = swe.calc_ut; get_ay = swe.get_ayanamsa_ut
+    jd_list = jds.tolist()
+    for i in np.argsort(jds, kind='stable').tolist():
+        jd = jd_list[i]; row_l = lons[i]; row_s = speeds[i]
+        for j, p in enumerate(SWE_BODIES):
+            xx, _ = calc_ut(jd, p, flags); row_l[j] = xx[0]; row_s[j] = xx[3]
+        ayan[i] = get_ay(jd)
+    lons[:, :8] %= 360.0
+    lons[:, 8] = (lons[:, 7] + 180.0) % 360.0; speeds[:, 8] = speeds[:, 7]
+    return EphemerisBatch(jds, lons, speeds, ayan)
+
+def ascendant_sign(jd, lat, lon, ay):
+    cusps, ascmc = swe.houses_ex(jd, lat, lon, b'P'); asc_trop = ascmc[0]; asc_sid = (asc_trop - ay) % 360.0
+    return int(asc_sid // 30) + 1, asc_sid
+
+
+# ---- Vimshottari dasha ----
+# Core timeline arithmetic is on float day counts / Julian days in NumPy arrays (one cumsum per
+# level, vectorised over any number of charts). build_mahadashas_days_utc() converts to datetimes
+# once, at the edge, for the report's MD table; kundali_dasha_lib builds its tree on sub_periods().
+YEARS_ARR = np.array([YEARS[L] for L in ORDER], dtype=float)   # indexed like ORDER
+MD_COLUMNS = 10                                                # balance MD + enough to pass 100 years
+
+def moon_balance_days(moon_sid):
+    NAK=360.0/27.0; part = moon_sid % 360.0; ni = int(part // NAK); pos = part - ni*NAK
+    md_lord = ORDER[ni % 9]; frac = pos/NAK; remaining_days = YEARS[md_lord]*(1 - frac)*YEAR_DAYS
+    return md_lord, remaining_days
+
+def mahadasha_timeline(epochs, moon_sids, span_years=100):
+    """Mahadasha timelines for a cohort in one pass.
+    epochs: (N,) birth instants as floats in days (Julian days, or 0.0 for offsets from birth);
+    moon_sids: (N,) natal Moon longitudes. Returns (lords, start, end, days), each (N, MD_COLUMNS):
+    ORDER indexes, period bounds on the same float scale clipped to epoch + span_years, and the
+    nominal length (the balance for the first). Columns past the span have start == end."""
+    epochs = np.atleast_1d(np.asarray(epochs, dtype=float))
+    part = np.atleast_1d(np.asarray(moon_sids, dtype=float)) % 360.0
+    ni = np.floor(part / NAK_SPAN).astype(np.intp)
+    first = ni % 9
+    lords = (first[:, None] + np.arange(MD_COLUMNS)) % 9
+    days = YEARS_ARR[lords] * YEAR_DAYS
+    days[:, 0] *= 1.0 - (part - ni * NAK_SPAN) / NAK_SPAN
+    end = np.cumsum(days, axis=1)
+    start = end - days
+    limit = span_years * YEAR_DAYS
+    start = epochs[:, None] + np.minimum(start, limit)
+    end = epochs[:, None] + np.minimum(end, limit)
+    return lords, start, end, days
+
+def sub_periods(lords, starts, days):
+    """The nine sub-periods of N parent periods at once: (lords, start, end), each (N, 9); each
+    sub-period starts exactly where the previous one ends."""
+    lords = np.atleast_1d(np.asarray(lords, dtype=np.intp))
+    starts = np.atleast_1d(np.asarray(starts, dtype=float))
+    days = np.atleast_1d(np.asarray(days, dtype=float))
+    sub = (lords[:, None] + np.arange(9)) % 9
+    d = YEARS_ARR[sub] * (days[:, None] / 120.0)
+    end = starts[:, None] + np.cumsum(d, axis=1)
+    return sub, np.concatenate((starts[:, None], end[:, :-1]), axis=1), end
+
+def build_mahadashas_days_utc(birth_utc_dt, moon_sid):
+    lords, start, end, days = mahadasha_timeline([0.0], [moon_sid])
+    segments = []
+    for L, s0, e0, d in zip(lords[0].tolist(), start[0].tolist(), end[0].tolist(), days[0].tolist()):
+        if s0 >= e0:
+            break
+        segments.append({"planet": ORDER[L], "start": birth_utc_dt + datetime.timedelta(days=s0),
+                         "end": birth_utc_dt + datetime.timedelta(days=e0), "days": d})
+    return segments
+
+
+# ---- Yogas / doshas (प्रमुख बिंदु) ----
+def _house_from_lagna(sign:int, lagna_sign:int)->int:
+    return ((sign - lagna_sign) % 12) + 1  # 1..12
+
+def detect_muntha_house(lagna_sign:int, dob_dt):
+    # Approx: years elapsed since birth to today -> advance houses from lagna
+    try:
+        from datetime import datetime, timezone
+        years = datetime.now(timezone.utc).year - dob_dt.year
+        return ((lagna_sign - 1 + years) % 12) + 1
+    except Exception:
+        return None
+
+def detect_sade_sati_or_dhaiyya(sidelons:dict, transit_dt=None):
+    # Returns: (status, phase) where status in {"साढ़ेसाती", "शनि ढैय्या", None}
+    # Uses *transit Saturn* vs *natal Moon*. Phase only if साढ़ेसाती: "प्रथम चरण" / "द्वितीय चरण" / "तृतीय चरण".
+    st = detect_saturn_transit(sidelons, transit_dt)
+    return (st.status, st.phase) if st is not None else (None, None)
+
+def detect_saturn_transit(sidelons:dict, transit_dt=None):
+    # kundali_transit_lib.SaturnTransit (status, phase, start / end dates) at transit_dt (or now),
+    # looked up in the shared Saturn ingress index instead of an ephemeris call per chart.
+    try:
+        from kundali_transit_lib import saturn_transit
+        return saturn_transit(planet_rasi_sign(sidelons['Mo']), transit_dt)
+    except Exception:
+        return None
+
+def detect_kaalsarp(sidelons:dict)->bool:
+    try:
+        ra = sidelons['Ra'] % 360.0
+        ke = (ra + 180.0) % 360.0
+        span = (ke - ra) % 360.0  # should be 180
+        inside = 0
+        for code in ['Su','Mo','Ma','Me','Ju','Ve','Sa']:
+            ang = (sidelons[code] - ra) % 360.0
+            if ang <= span:
+                inside += 1
+        return inside == 7
+    except Exception:
+        return False
+
+def detect_chandal(sidelons:dict)->bool:
+    try:
+        ju = planet_rasi_sign(sidelons['Ju'])
+        return ju == planet_rasi_sign(sidelons['Ra']) or ju == planet_rasi_sign(sidelons['Ke'])
+    except Exception:
+        return False
+
+def detect_pitru(sidelons:dict)->bool:
+    try:
+        su = planet_rasi_sign(sidelons['Su'])
+        return su == planet_rasi_sign(sidelons['Ra']) or su == planet_rasi_sign(sidelons['Ke'])
+    except Exception:
+        return False
+
+def detect_neech_bhang(sidelons:dict, lagna_sign:int)->bool:
+    try:
+        stats = compute_statuses_all(sidelons)
+        for code in ['Su','Mo','Ma','Me','Ju','Ve','Sa']:
+            if stats[code]['debil_rasi']:
+                debil_sign = stats[code]['rasi']
+                lord = SIGN_LORD.get(debil_sign)
+                if lord and lord in sidelons:
+                    lord_sign = planet_rasi_sign(sidelons[lord])
+                    h = _house_from_lagna(lord_sign, lagna_sign)
+                    if h in (1,4,7,10):
+                        return True
+        return False
+    except Exception:
+        return False
+
+def detect_yogas(sidelons:dict, lagna_sign:int, dob_dt, transit_dt=None)->Yogas:
+    st = detect_saturn_transit(sidelons, transit_dt)
+    status = st.status if st is not None else None
+    return Yogas(
+        muntha_house=detect_muntha_house(lagna_sign, dob_dt),
+        sade_sati=status,
+        sade_sati_phase=st.phase if status == "साढ़ेसाती" else None,
+        sade_sati_start=st.start if status else None,
+        sade_sati_end=st.end if status else None,
+        kaalsarp=detect_kaalsarp(sidelons),
+        chandal=detect_chandal(sidelons),
+        pitru=detect_pitru(sidelons),
+        neech_bhang=detect_neech_bhang(sidelons, lagna_sign),
+    )
+
+
+# ---- One-call chart computation ----
+def compute_chart(dt_utc, lat, lon, transit_dt=None, with_yogas=True)->ChartResult:
+    """Compute the full chart for a naive UTC birth datetime and a lat/lon."""
+    jd, ay, sidelons = sidereal_positions(dt_utc)
+    lagna_sign, asc_sid = ascendant_sign(jd, lat, lon, ay)
+    nav_lagna_sign = navamsa_sign_from_lon_sid(asc_sid)
+    md_segments = build_mahadashas_days_utc(dt_utc, sidelons['Mo'])
+    yogas = detect_yogas(sidelons, lagna_sign, dt_utc, transit_dt) if with_yogas else None
+    return ChartResult(dt_utc=dt_utc, lat=lat, lon=lon, jd=jd, ayanamsa=ay, sidelons=sidelons,
+                       lagna_sign=lagna_sign, asc_sid=asc_sid, nav_lagna_sign=nav_lagna_sign,
+                       md_segments=md_segments, yogas=yogas)
@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+# kundali_pdf_lib.py
+# Native one-page PDF of a KundaliReport (fpdf2): same data and layout as the DOCX — personal
+# details, ग्रह स्थिति, both dasha tables, प्रमुख बिंदु and both charts — drawn straight to PDF,
+# with the charts taken from kundali_chart_lib's cached geometry / planet layout.
+# fpdf2 and a Devanagari TTF/OTF are optional: pdf_available() says whether this path can run.
+# Font lookup: $KUNDALI_PDF_FONT, then assets/fonts/*.ttf|*.otf, then common system locations.
+
+import glob, os
+from functools import lru_cache
+from io import BytesIO
+
+try:
+    from fpdf import FPDF
+except Exception:   # optional dependency
+    FPDF = None
+
+from kundali_chart_lib import NUM_W_PT, NUM_H_PT, chart_geometry, planet_layout, rotated_house_labels
+from kundali_report_lib import POSITIONS_HEADER, MAHADASHA_HEADER, ANTARDASHA_HEADER
+
+PDF_FONT_ENV = "KUNDALI_PDF_FONT"
+PDF_FONT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets", "fonts")
+SYSTEM_FONTS = (
+    "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansDevanagari-Regular.otf",
+    "/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf",
+    "/usr/share/fonts/truetype/Gargi/Gargi.ttf",
+    "C:/Windows/Fonts/mangal.ttf",
+    "C:/Windows/Fonts/Nirmala.ttf",
+)
+
+# Layout (pt); A4 with the DOCX margins
+MARGIN_X = 28.35                 # 10 mm
+MARGIN_TOP = 22.68               # 8 mm
+COL_W = 3.70 * 72                # two equal columns, as the DOCX outer table
+CHART_PT = int(3.70 * 72 - 10)   # same chart square as the DOCX
+TABLE_PT = 7.0
+HEADER_W = 260
+ARROWS = {'↑': -1, '↓': 1}        # planet label marks (kundali_report_lib.fmt_planet_label)
+ARROW_W = 3
+
+ORANGE = (204, 102, 0)           # table header fill
+ALT_ROW = (255, 235, 224)        # alternate row fill
+BORDER = (210, 105, 30)          # #D2691E
+SECTION_FILL = (241, 90, 35)     # #F15A23
+CHART_LINE = (204, 102, 0)       # #CC6600
+CHART_FILL = (255, 220, 200)     # #ffdcc8
+
+
+def _bold_sibling(path):
+    d, f = os.path.split(path)
+    for a, b in (("Regular", "Bold"), ("-Regular", "-Bold"), ("mangal.ttf", "mangalb.ttf"), ("Nirmala.ttf", "NirmalaB.ttf")):
+        if a in f:
+            cand = os.path.join(d, f.replace(a, b))
+            if os.path.exists(cand):
+                return cand
+    return None
+
+@lru_cache(maxsize=1)
+def find_devanagari_font():
+    """(regular_path, bold_path or None), or None when no usable font is installed."""
+    env = os.getenv(PDF_FONT_ENV, "")
+    cands = [env] if env else []
+    cands += sorted(glob.glob(os.path.join(PDF_FONT_DIR, "*.ttf")) + glob.glob(os.path.join(PDF_FONT_DIR, "*.otf")))
+    cands = [c for c in cands if "bold" not in os.path.basename(c).lower()] + list(SYSTEM_FONTS)
+    for c in cands:
+        if c and os.path.exists(c):
+            return c, _bold_sibling(c)
+    return None
+
+def pdf_available():
+    return FPDF is not None and find_devanagari_font() is not None
+
+
+# ---- drawing helpers ----
+def _new_pdf():
+    regular, bold = find_devanagari_font()
+    pdf = FPDF(unit="pt", format="A4")
+    pdf.set_margins(MARGIN_X, MARGIN_TOP, MARGIN_X)
+    pdf.set_auto_page_break(False)
+    pdf.add_font("deva", "", regular)
+    pdf.add_font("deva", "B", bold or regular)
+    try:
+        pdf.set_text_shaping(True)   # conjuncts / matras need uharfbuzz
+    except Exception:
+        pass
+    pdf.add_page()
+    return pdf
+
+def _cell(pdf, w, h, text, **kw):
+    """pdf.cell() with HarfBuzz shaping (and fpdf's bidi pass) only for non-ASCII text;
+    digits, dates and DMS values skip it."""
+    shaped = not text.isascii()
+    if bool(pdf.text_shaping) != shaped:
+        pdf.set_text_shaping(shaped)
+    pdf.cell(w, h, text, **kw)
+
+def _section_header(pdf, x, y, w, title):
+    bx = x + (COL_W - w) / 2
+    pdf.set_fill_color(*SECTION_FILL); pdf.set_draw_color(*BORDER); pdf.set_line_width(1.5)
+    pdf.rect(bx, y, w, 20, style="DF", round_corners=True, corner_radius=9)
+    pdf.set_font("deva", "B", 12); pdf.set_text_color(255, 255, 255)
+    pdf.set_xy(bx, y); _cell(pdf, w, 20, title, align="C")
+    pdf.set_text_color(0, 0, 0)
+    return y + 26
+
+def _table(pdf, x, y, header, rows, col_widths_in):
+    """Single-line bordered table centred in the column; first row styled as the heading, odd rows
+    shaded, like apply_premium_table_style() in the DOCX. Drawn with plain cells (fpdf's table()
+    re-flows every cell through multi_cell, ~10x slower for these one-line values)."""
+    widths = [w * 72 for w in col_widths_in]
+    tx = x + (COL_W - sum(widths)) / 2
+    rh = TABLE_PT * 1.6
+    pdf.set_draw_color(*BORDER); pdf.set_line_width(0.5)
+    for i, row in enumerate(([header] if header else []) + list(rows)):
+        if i == 0:
+            pdf.set_font("deva", "B", TABLE_PT); pdf.set_fill_color(*ORANGE); pdf.set_text_color(255, 255, 255)
+        else:
+            pdf.set_font("deva", "", TABLE_PT); pdf.set_fill_color(*(ALT_ROW if i % 2 else (255, 255, 255)))
+            pdf.set_text_color(51, 51, 51)
+        pdf.set_xy(tx, y)
+        for w, c in zip(widths, row):
+            _cell(pdf, w, rh, "" if c is None else str(c), border=1, align="C", fill=True)
+        y += rh
+    pdf.set_text_color(0, 0, 0)
+    return y + 6
+
+def _details_box(pdf, report, x, y):
+    w, h = 3.85 * 72 - 10, 92
+    pdf.set_draw_color(*ORANGE); pdf.set_line_width(3)
+    pdf.rect(x, y, w, h, style="D", round_corners=True, corner_radius=12)
+    pdf.set_font("deva", "B", 12); pdf.set_xy(x, y + 6); _cell(pdf, w, 16, "व्यक्तिगत विवरण", align="C")
+    details = (("नाम:", report.name), ("जन्म तिथि:", report.dt_local.strftime('%Y-%m-%d')),
+               ("जन्म समय:", report.dt_local.strftime('%H:%M:%S')), ("स्थान:", report.place))
+    ty = y + 26
+    for label, value in details:
+        pdf.set_xy(x + 10, ty); pdf.set_font("deva", "B", 10); _cell(pdf, 1.3 * 72 - 10, 14, label)
+        pdf.set_font("deva", "", 10); _cell(pdf, w - 1.3 * 72 - 4, 14, str(value or ""))
+        ty += 15
+
+def _arrow(pdf, x, yc, d):
+    """Small vertical arrow centred on (x, yc); d=-1 points up, 1 down."""
+    pdf.set_line_width(0.5); pdf.set_fill_color(0, 0, 0)
+    pdf.line(x, yc - 2.5 * d, x, yc + 1.2 * d)
+    pdf.polygon([(x - 1.3, yc + 0.8 * d), (x + 1.3, yc + 0.8 * d), (x, yc + 3 * d)], style="F")
+
+def _chart(pdf, x, y, S, lagna_sign, house_planets):
+    """Same drawing as kundali_chart_lib.kundali_svg(), in PDF primitives."""
+    labels = rotated_house_labels(lagna_sign)
+    h = S / 2
+    pdf.set_draw_color(*CHART_LINE); pdf.set_fill_color(*CHART_FILL); pdf.set_line_width(3)
+    pdf.rect(x, y, S, S, style="DF")
+    pdf.set_line_width(1.25)
+    pdf.line(x, y, x + S, y + S); pdf.line(x + S, y, x, y + S)
+    pdf.polygon([(x + h, y), (x + S, y + h), (x + h, y + S), (x, y + h)], style="D")
+    pdf.set_font("deva", "", 7); pdf.set_fill_color(255, 255, 255)
+    for k, _, _, left, top in chart_geometry(S):
+        pdf.rect(x + left, y + top, NUM_W_PT, NUM_H_PT, style="F")
+        pdf.set_xy(x + left, y + top); _cell(pdf, NUM_W_PT, NUM_H_PT, labels[str(k)], align="C")
+    pdf.set_draw_color(0, 0, 0)
+    for label, left, top, pw, ph, selfr, varg in planet_layout(S, house_planets):
+        # exalted / debilitated arrows are drawn, not typeset: Devanagari fonts rarely carry U+2191/2193
+        marks = [ch for ch in label if ch in ARROWS]
+        text = "".join(ch for ch in label if ch not in ARROWS)
+        shift = ARROW_W * len(marks) / 2
+        pdf.set_xy(x + left - shift, y + top); _cell(pdf, pw, ph, text, align="C")
+        ax = x + left - shift + (pw + pdf.get_string_width(text)) / 2 + ARROW_W / 2
+        for ch in marks:
+            _arrow(pdf, ax, y + top + ph / 2, ARROWS[ch]); ax += ARROW_W
+        pdf.set_line_width(0.75); pdf.set_fill_color(255, 255, 255)
+        if selfr:
+            pdf.ellipse(x + left + 2, y + top + 1, pw - 4, ph - 2, style="D")
+        if varg:
+            pdf.rect(x + left + pw - 4.5, y + top - 2, 5, 5, style="DF")
+
+
+def render_kundali_pdf(report, out=None):
+    """Write the one-page PDF for a KundaliReport into out (a new BytesIO by default) and return it."""
+    if not pdf_available():
+        raise RuntimeError("PDF export needs fpdf2 and a Devanagari font (set KUNDALI_PDF_FONT).")
+    pdf = _new_pdf()
+    x0, x1 = MARGIN_X, MARGIN_X + COL_W
+
+    # Header: personal details (left), brand (right), title
+    y = MARGIN_TOP
+    _details_box(pdf, report, x0, y)
+    pdf.set_font("Times", "B", 36); pdf.set_xy(x0 + 3.85 * 72, y + 18)
+    pdf.cell(pdf.w - MARGIN_X - pdf.get_x(), 40, "MRIDAASTRO", align="C")
+    pdf.set_font("Times", "I", 10); pdf.set_xy(x0 + 3.85 * 72, y + 60)
+    pdf.cell(pdf.w - MARGIN_X - pdf.get_x(), 14, "In the light of the divine, let your soul journey shine.", align="C")
+    y += 100
+    pdf.set_font("Times", "B", 20); pdf.set_xy(x0, y)
+    pdf.cell(pdf.w - 2 * MARGIN_X, 26, "PERSONAL HOROSCOPE (JANMA KUNDALI)", align="C")
+    top = y + 34
+
+    # Left column: tables
+    y = _section_header(pdf, x0, top, HEADER_W, "ग्रह स्थिति")
+    y = _table(pdf, x0, y, POSITIONS_HEADER, report.positions, [0.70, 0.55, 0.85, 0.80, 0.80])
+    y = _section_header(pdf, x0, y, HEADER_W, "विंशोत्तरी महादशा")
+    y = _table(pdf, x0, y, MAHADASHA_HEADER, report.mahadasha, [1.20, 1.50, 1.00])
+    y = _section_header(pdf, x0, y, HEADER_W, "महादशा / अंतरदशा")
+    y = _table(pdf, x0, y, ANTARDASHA_HEADER, report.antardasha, [1.30, 1.40, 1.00])
+    y = _section_header(pdf, x0, y, HEADER_W, "प्रमुख बिंदु")
+    if report.pramukh_bindu:
+        _table(pdf, x0, y, None, report.pramukh_bindu, [1.85, 1.85])
+
+    # Right column: charts
+    cx = x1 + (COL_W - CHART_PT) / 2
+    y = _section_header(pdf, x1, top, CHART_PT, "लग्न कुंडली")
+    _chart(pdf, cx, y, CHART_PT, report.chart.lagna_sign, report.rasi_houses)
+    y = _section_header(pdf, x1, y + CHART_PT + 10, CHART_PT, "नवांश कुंडली")
+    _chart(pdf, cx, y, CHART_PT, report.chart.nav_lagna_sign, report.nav_houses)
+
+    out = out if out is not None else BytesIO()
+    out.write(pdf.output())
+    out.seek(0)
+    return out
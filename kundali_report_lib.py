@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+# kundali_report_lib.py
+# Everything one kundali report shows, as plain picklable data: personal details, the ग्रह स्थिति
+# rows, both dasha tables, प्रमुख बिंदु and the house -> planet maps of both charts.
+# The DOCX and PDF writers (and batch jobs) render from the same KundaliReport, so the
+# chart is computed once however many formats are produced. No Streamlit / docx / pandas here.
+
+import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+import pytz
+
+from kundali_engine_lib import (
+    YEAR_DAYS, PLANETS, ORDER, ChartResult, compute_chart, compute_statuses_all,
+    planet_rasi_sign, navamsa_sign_from_lon_sid,
+)
+from kundali_dasha_lib import DashaTree
+from kundali_vector_lib import classify_longitudes, fmt_dms
+
+
+HN = {'Su':'सूर्य','Mo':'चंद्र','Ma':'मंगल','Me':'बुध','Ju':'गुरु','Ve':'शुक्र','Sa':'शनि','Ra':'राहु','Ke':'केतु'}
+
+# Compact Hindi abbreviations for planet boxes
+HN_ABBR = {'Su':'सू','Mo':'चं','Ma':'मं','Me':'बु','Ju':'गु','Ve':'शु','Sa':'श','Ra':'रा','Ke':'के'}
+
+POSITIONS_HEADER = ("ग्रह", "राशि", "अंश", "नक्षत्र", "उप‑नक्षत्र")
+MAHADASHA_HEADER = ("ग्रह", "समाप्ति तिथि", "आयु (वर्ष)")
+ANTARDASHA_HEADER = ("महादशा", "अंतरदशा", "तिथि")
+ANTARDASHA_ROWS = 5
+
+
+def _make_flags(view, st):
+    """Reduce the big dict to the fields used by the renderer for a given chart view."""
+    if view == 'nav':
+        return {
+            'self': st['self_nav'],
+            'exalted': st['exalt_nav'],
+            'debilitated': st['debil_nav'],
+            'vargottama': st['vargottama'],
+            'combust': False,
+        }
+    # default: rasi
+    return {
+        'self': st['self_rasi'],
+        'exalted': st['exalt_rasi'],
+        'debilitated': st['debil_rasi'],
+        'vargottama': st['vargottama'],
+        'combust': st['combust'],
+    }
+
+def fmt_planet_label(code, flags):
+    base = HN_ABBR.get(code, code)
+    if flags.get('exalted'): base += '↑'
+    if flags.get('debilitated'): base += '↓'
+    if flags.get('combust'): base += '^'
+    return base
+
+
+# ---- chart house maps ----
+def planet_navamsa_house(lon_sid, nav_lagna_sign):
+    # Return 1..12 house index in Navamsa for a planet
+    nav_sign = navamsa_sign_from_lon_sid(lon_sid)  # 1..12
+    return ((nav_sign - nav_lagna_sign) % 12) + 1
+
+def build_navamsa_house_planets(sidelons, nav_lagna_sign):
+    # Map: house -> list of planet abbreviations in Navamsa
+    house_map = {i: [] for i in range(1, 13)}
+    for code in ['Su','Mo','Ma','Me','Ju','Ve','Sa','Ra','Ke']:
+        h = planet_navamsa_house(sidelons[code], nav_lagna_sign)
+        house_map[h].append(HN_ABBR.get(code, code))
+    return house_map
+
+def build_rasi_house_planets_marked(sidelons, lagna_sign):
+    house_map = {i: [] for i in range(1, 13)}
+    stats = compute_statuses_all(sidelons)
+    for code in ['Su','Mo','Ma','Me','Ju','Ve','Sa','Ra','Ke']:
+        sign = planet_rasi_sign(sidelons[code])
+        h = ((sign - lagna_sign) % 12) + 1
+        fl = _make_flags('rasi', stats[code])
+        label = fmt_planet_label(code, fl)
+        house_map[h].append({'txt': label, 'flags': fl})
+    return house_map
+
+def build_navamsa_house_planets_marked(sidelons, nav_lagna_sign):
+    house_map = {i: [] for i in range(1, 13)}
+    stats = compute_statuses_all(sidelons)
+    sun_nav = stats['Su']['nav']  # Sun's Navāṁśa sign
+    for code in ['Su','Mo','Ma','Me','Ju','Ve','Sa','Ra','Ke']:
+        nav_sign = navamsa_sign_from_lon_sid(sidelons[code])
+        h = ((nav_sign - nav_lagna_sign) % 12) + 1
+        fl = _make_flags('nav', stats[code])   # nav-based self/exalt/debil
+        # Navāṁśa combust rule: planet combust iff shares Nav sign with Sun
+        if code not in ('Su','Ra','Ke'):
+            fl['combust'] = (nav_sign == sun_nav)
+        else:
+            fl['combust'] = False
+        label = fmt_planet_label(code, fl)
+        house_map[h].append({'txt': label, 'flags': fl})
+    return house_map
+
+def build_rasi_house_planets(sidelons, lagna_sign):
+    # Map: house -> list of planet abbreviations in Rasi (Lagna) chart
+    house_map = {i: [] for i in range(1, 13)}
+    for code in ['Su','Mo','Ma','Me','Ju','Ve','Sa','Ra','Ke']:
+        sign = int(sidelons[code] // 30) + 1  # 1..12
+        h = ((sign - lagna_sign) % 12) + 1
+        house_map[h].append(HN_ABBR.get(code, code))
+    return house_map
+
+
+# ---- table rows ----
+def sanitize_filename(name: str) -> str:
+    # Keep spaces; strip leading/trailing; allow letters/digits/space/_/- only
+    raw = (name or 'Horoscope').strip()
+    cleaned = ''.join(ch for ch in raw if ch.isalnum() or ch in ' _-')
+    return cleaned or 'Horoscope'
+
+def _utc_to_local(dt_utc, tzname, tz_hours, used_manual):
+    if used_manual: return dt_utc + datetime.timedelta(hours=tz_hours)
+    try:
+        tz = pytz.timezone(tzname); return tz.fromutc(dt_utc.replace(tzinfo=pytz.utc))
+    except Exception:
+        return dt_utc + datetime.timedelta(hours=tz_hours)
+
+def _english_bhav_label(h:int)->str:
+    try:
+        h_int = int(h)
+    except Exception:
+        return f"{h}वाँ भाव"
+    return f"{h_int}वाँ भाव"
+
+def positions_rows(sidelons):
+    """ग्रह स्थिति rows: (planet, sign, DMS in sign, nakshatra lord, KP sub lord), Hindi names."""
+    c = classify_longitudes([sidelons[code] for code in PLANETS])
+    rows=[]
+    for i, code in enumerate(PLANETS):
+        deg_str = fmt_dms(int(c.deg[i]), int(c.minute[i]), int(c.second[i]))
+        rows.append((HN[code], int(c.sign[i]), deg_str, HN[ORDER[c.nak_lord[i]]], HN[ORDER[c.sub_lord[i]]]))
+    return tuple(rows)
+
+def pramukh_bindu_rows(yogas, to_local=None):
+    rows = []
+
+    # Muntha
+    m = yogas.muntha_house
+    if m:
+        rows.append(("मुन्था (वर्तमान वर्ष)", _english_bhav_label(m)))
+
+    # Sade Sati / Dhaiyya
+    status, phase = yogas.sade_sati, yogas.sade_sati_phase
+    if status:
+        rows.append(("साढ़ेसाती/शनि ढैय्या", status))
+        if status == "साढ़ेसाती" and phase:
+            rows.append(("साढ़ेसाती का चरण", phase))
+        start, end = yogas.sade_sati_start, yogas.sade_sati_end
+        if start and end:
+            if to_local is not None:     # yogas dates are naive UTC; show the chart's local dates
+                start, end = to_local(start), to_local(end)
+            rows.append((f"{status} की अवधि", f"{start:%d-%m-%Y} से {end:%d-%m-%Y}"))
+
+    # Dosha/Yoga (only if True)
+    if yogas.kaalsarp:
+        rows.append(("कालसर्प दोष", "हाँ"))
+    if yogas.chandal:
+        rows.append(("चांडाल योग", "हाँ"))
+    if yogas.pitru:
+        rows.append(("पितृ दोष", "हाँ"))
+    if yogas.neech_bhang:
+        rows.append(("नीच भंग राज योग", "हाँ"))
+    return tuple(rows)
+
+
+@dataclass(frozen=True)
+class KundaliReport:
+    name: str
+    place: str
+    dt_local: datetime.datetime     # naive local birth time as entered
+    tzname: str
+    tz_hours: float
+    chart: ChartResult
+    positions: tuple                # POSITIONS_HEADER rows
+    mahadasha: tuple                # MAHADASHA_HEADER rows
+    antardasha: tuple               # ANTARDASHA_HEADER rows, next few antardashas from now
+    pramukh_bindu: tuple            # (label, value) rows; empty when nothing applies
+    rasi_houses: dict               # house -> [{'txt', 'flags'}] for the लग्न chart
+    nav_houses: dict                # same for the नवांश chart
+
+    @property
+    def filename_stem(self):
+        return f"{sanitize_filename(self.name)}_Horoscope"
+
+
+def build_report(name, place, dt_local, dt_utc, lat, lon, tzname, tz_hours, used_manual=False,
+                 now_utc: Optional[datetime.datetime] = None, chart: Optional[ChartResult] = None):
+    """Compute the chart (unless given) and every table the report needs."""
+    if chart is None:
+        chart = compute_chart(dt_utc, lat, lon)
+    sidelons = chart.sidelons
+
+    def to_local(end_utc):
+        return _utc_to_local(end_utc, tzname, tz_hours, used_manual)
+
+    def age_years(birth_dt_local, end_utc):
+        days = (to_local(end_utc).date() - birth_dt_local.date()).days
+        return int(days // YEAR_DAYS)
+
+    mahadasha = tuple(
+        (HN[s["planet"]], to_local(s["end"]).strftime("%d-%m-%Y"), age_years(dt_local, s["end"]))
+        for s in chart.md_segments
+    )
+    now_utc = now_utc or datetime.datetime.utcnow()
+    horizon = now_utc + datetime.timedelta(days=365*10)
+    antars = DashaTree.from_chart(chart, levels=2).periods(2, now_utc, horizon)
+    antardasha = tuple(
+        (HN[a.parent.lord], HN[a.lord], to_local(min(a.end_utc, horizon)).strftime("%d-%m-%Y"))
+        for a in antars[:ANTARDASHA_ROWS]
+    )
+    return KundaliReport(
+        name=name, place=place, dt_local=dt_local, tzname=tzname, tz_hours=tz_hours, chart=chart,
+        positions=positions_rows(sidelons), mahadasha=mahadasha, antardasha=antardasha,
+        pramukh_bindu=pramukh_bindu_rows(chart.yogas, to_local) if chart.yogas is not None else (),
+        rasi_houses=build_rasi_house_planets_marked(sidelons, chart.lagna_sign),
+        nav_houses=build_navamsa_house_planets_marked(sidelons, chart.nav_lagna_sign),
+    )
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# kundali_transit_lib.py
+# Transit ("gochar") lookups shared by every chart in the process.
+# - current_sky(): sidereal positions of "now", computed once per TRANSIT_BUCKET_SECONDS bucket and
+#   reused by all sessions / batch rows (a chart no longer triggers its own ephemeris call for now).
+# - Saturn sign ingresses over 1800-2100, from transit_index_lib or found once per process (coarse
+#   scan + bisection on swe.calc_ut), so Sade Sati / Dhaiyya status, phase and start / end dates for any natal Moon sign
+#   are a binary search in a small sorted array.
+
+import datetime
+import threading
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+import numpy as np
+import swisseph as swe
+
+from kundali_engine_lib import PLANETS, set_sidereal_locked, sidereal_positions, planet_rasi_sign
+
+TRANSIT_BUCKET_SECONDS = 3600
+INGRESS_YEARS = (1800, 2100)
+INGRESS_SCAN_DAYS = 8.0            # Saturn never spends less than ~8 days across a sign boundary and back
+INGRESS_TOL_DAYS = 1.0 / 1440     # bisect to a minute
+PERIOD_MERGE_DAYS = 730.0          # retrograde dips out of a period last months; whole periods are decades apart
+
+SADE_SATI = "साढ़ेसाती"
+DHAIYYA = "शनि ढैय्या"
+SADE_SATI_PHASES = {11: "प्रथम चरण", 0: "द्वितीय चरण", 1: "तृतीय चरण"}   # Saturn sign - Moon sign (mod 12)
+DHAIYYA_OFFSETS = (3, 7)                                                     # 4th / 8th from the Moon
+
+
+class TransitSky(NamedTuple):
+    bucket_utc: datetime.datetime  # naive UTC start of the bucket the positions are for
+    jd: float
+    ayanamsa: float
+    sidelons: dict                 # planet code -> sidereal longitude, like ChartResult.sidelons
+
+
+class SaturnTransit(NamedTuple):
+    status: Optional[str]                    # SADE_SATI / DHAIYYA / None
+    phase: Optional[str]                     # only for SADE_SATI
+    start: Optional[datetime.datetime]       # naive UTC; None outside INGRESS_YEARS
+    end: Optional[datetime.datetime]
+    phase_start: Optional[datetime.datetime]
+    phase_end: Optional[datetime.datetime]
+
+
+# ---- current sky ----
+def _naive_utc(dt):
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return dt
+
+def _utcnow():
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+def transit_bucket(dt_utc, seconds=TRANSIT_BUCKET_SECONDS):
+    """Start of the bucket containing dt_utc (naive UTC)."""
+    dt_utc = _naive_utc(dt_utc)
+    epoch = datetime.datetime(1970, 1, 1)
+    s = int((dt_utc - epoch).total_seconds() // seconds) * seconds
+    return epoch + datetime.timedelta(seconds=s)
+
+@lru_cache(maxsize=8)
+def _sky_at_bucket(bucket_utc):
+    jd, ay, lons = sidereal_positions(bucket_utc)
+    return TransitSky(bucket_utc, jd, ay, lons)
+
+def current_sky(now_utc=None):
+    """Transit positions for the bucket containing now_utc (default: now), shared process-wide."""
+    return _sky_at_bucket(transit_bucket(now_utc or _utcnow()))
+
+
+# ---- Saturn ingresses ----
+def _jd(dt_utc):
+    return swe.julday(dt_utc.year, dt_utc.month, dt_utc.day,
+                      dt_utc.hour + dt_utc.minute/60 + dt_utc.second/3600 + dt_utc.microsecond/3.6e9)
+
+def _datetime(jd):
+    y, m, d, h = swe.revjul(jd)
+    return datetime.datetime(y, m, d) + datetime.timedelta(hours=h)
+
+def _scan_lons(jds, body_index):
+    """Sidereal longitudes of one body at many JDs: from the ephemeris table when built, else calc_ut."""
+    try:
+        from ephemeris_table_lib import get_ephemeris_table
+        table = get_ephemeris_table()
+    except Exception:
+        table = None
+    if table is not None and table.covers(jds):
+        return table.lons_at_jd(jds)[:, body_index]
+    set_sidereal_locked(); flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
+    body = [swe.SUN, swe.MOON, swe.MARS, swe.MERCURY, swe.JUPITER, swe.VENUS, swe.SATURN][body_index]
+    return np.array([swe.calc_ut(jd, body, flags)[0][0] % 360.0 for jd in jds.tolist()])
+
+def _bisect_ingress(body, a, b, sign_a):
+    """JD in (a, b] where the body leaves sign_a (0-based); the sign changes exactly once in between."""
+    set_sidereal_locked(); flags = swe.FLG_SWIEPH | swe.FLG_SIDEREAL
+    while b - a > INGRESS_TOL_DAYS:
+        mid = 0.5 * (a + b)
+        if int((swe.calc_ut(mid, body, flags)[0][0] % 360.0) // 30) == sign_a:
+            a = mid
+        else:
+            b = mid
+    return b
+
+_ingress_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _saturn_ingresses_cached():
+    try:
+        from transit_index_lib import get_transit_index
+        index = get_transit_index()
+    except Exception:
+        index = None
+    if index is not None:
+        return index.segments('Sa')
+    jd0 = swe.julday(INGRESS_YEARS[0], 1, 1, 0.0)
+    jd1 = swe.julday(INGRESS_YEARS[1] + 1, 1, 1, 0.0)
+    jds = np.arange(jd0, jd1 + INGRESS_SCAN_DAYS, INGRESS_SCAN_DAYS)
+    signs = (_scan_lons(jds, PLANETS.index('Sa')) // 30).astype(np.int8)
+    at = [jd0]; sign = [signs[0]]
+    for i in np.flatnonzero(signs[1:] != signs[:-1]).tolist():
+        at.append(_bisect_ingress(swe.SATURN, jds[i], jds[i + 1], int(signs[i])))
+        sign.append(signs[i + 1])
+    at.append(jd1)
+    return np.array(at), np.array(sign, dtype=np.int8) + 1
+
+def saturn_ingresses():
+    """(jds, signs): Saturn is in rasi signs[k] (1..12) from jds[k] to jds[k + 1]; jds[0] / jds[-1]
+    are the ends of INGRESS_YEARS, not ingresses. Read from the transit index when built, else
+    found on first use (~0.7 s, ms with the ephemeris table)."""
+    with _ingress_lock:
+        return _saturn_ingresses_cached()
+
+def _periods(jds, signs, keep):
+    """[(jd_start, jd_end)] of the runs of segments whose sign satisfies keep(); runs split only by
+    a retrograde dip shorter than PERIOD_MERGE_DAYS count as one period."""
+    inside = np.array([bool(keep(int(x))) for x in signs.tolist()] + [False])
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], inside)).astype(np.int8)))
+    out = []
+    for lo, hi in zip(edges[::2].tolist(), edges[1::2].tolist()):   # segments lo .. hi - 1
+        if out and jds[lo] - out[-1][1] < PERIOD_MERGE_DAYS:
+            out[-1] = (out[-1][0], jds[hi])
+        else:
+            out.append((jds[lo], jds[hi]))
+    return out
+
+def _period_at(jds, signs, keep, jd):
+    """The _periods() entry containing jd, or (None, None); walks out from jd's segment to the run
+    boundaries (bridging the same short dips) instead of building every period."""
+    n = len(signs)
+    k = int(np.searchsorted(jds, jd, side='right')) - 1
+    kept = lambda i: bool(keep(int(signs[i])))
+    if not 0 <= k < n:
+        return None, None
+    lo, hi = k, k + 1
+    if not kept(k):                      # inside a dip: only a period if the dip is bridged
+        while lo >= 0 and not kept(lo):
+            lo -= 1
+        while hi < n and not kept(hi):
+            hi += 1
+        if lo < 0 or hi >= n or jds[hi] - jds[lo + 1] >= PERIOD_MERGE_DAYS:
+            return None, None
+        hi += 1
+    while True:
+        while lo > 0 and kept(lo - 1):
+            lo -= 1
+        j = lo - 1
+        while j >= 0 and not kept(j):
+            j -= 1
+        if j < 0 or jds[lo] - jds[j + 1] >= PERIOD_MERGE_DAYS:
+            break
+        lo = j
+    while True:
+        while hi < n and kept(hi):
+            hi += 1
+        j = hi
+        while j < n and not kept(j):
+            j += 1
+        if j >= n or jds[j] - jds[hi] >= PERIOD_MERGE_DAYS:
+            break
+        hi = j
+    return jds[lo], jds[hi]
+
+def _classify(sat_sign, moon_sign):
+    d = (sat_sign - moon_sign) % 12
+    if d in SADE_SATI_PHASES:
+        return SADE_SATI, SADE_SATI_PHASES[d]
+    if d in DHAIYYA_OFFSETS:
+        return DHAIYYA, None
+    return None, None
+
+def saturn_transit(moon_sign, dt_utc=None):
+    """SaturnTransit of a natal Moon sign (1..12) at dt_utc (default: now).
+    Start / end span the whole Sade Sati (or Dhaiyya), first entry to final exit, bridging retrograde
+    dips; phase_start / phase_end the same for the current sign. Dates are None outside INGRESS_YEARS."""
+    dt_utc = _naive_utc(dt_utc) if dt_utc is not None else None
+    jd = _jd(dt_utc or _utcnow())
+    jds, signs = saturn_ingresses()
+    if not jds[0] <= jd < jds[-1]:
+        sky = current_sky() if dt_utc is None else TransitSky(None, *sidereal_positions(dt_utc))
+        status, phase = _classify(planet_rasi_sign(sky.sidelons['Sa']), moon_sign)
+        return SaturnTransit(status, phase, None, None, None, None)
+
+    sat = int(signs[int(np.searchsorted(jds, jd, side='right')) - 1])
+    status, phase = _classify(sat, moon_sign)
+    if status is None:
+        return SaturnTransit(None, None, None, None, None, None)
+
+    def date(x):
+        # jds[0] / jds[-1] are the table limits, not real ingresses
+        return _datetime(x) if x is not None and jds[0] < x < jds[-1] else None
+
+    a, b = _period_at(jds, signs, lambda s: _classify(s, moon_sign)[0] == status and
+                      (status == SADE_SATI or s == sat), jd)
+    pa, pb = _period_at(jds, signs, lambda s: s == sat, jd)
+    return SaturnTransit(status, phase, date(a), date(b), date(pa), date(pb))
+
+def sade_sati_periods(moon_sign, start_utc=None, end_utc=None):
+    """[(start, end)] naive UTC of every Sade Sati overlapping [start_utc, end_utc] (default: whole range)."""
+    jds, signs = saturn_ingresses()
+    j0 = _jd(_naive_utc(start_utc)) if start_utc else jds[0]
+    j1 = _jd(_naive_utc(end_utc)) if end_utc else jds[-1]
+    out = []
+    for a, b in _periods(jds, signs, lambda s: _classify(s, moon_sign)[0] == SADE_SATI):
+        if b >= j0 and a <= j1:
+            out.append((_datetime(a) if a > jds[0] else None, _datetime(b) if b < jds[-1] else None))
+    return out
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# kundali_vector_lib.py
+# NumPy versions of the per-longitude classifiers in kundali_engine_lib
+# (rasi sign, navamsa sign, nakshatra lord, KP sub / sub-sub lord, DMS parts).
+# Every function takes an array of sidereal longitudes of any shape - e.g. the (N, 9)
+# EphemerisBatch.lons - and returns integer arrays of the same shape.
+
+from typing import NamedTuple
+
+import numpy as np
+
+from kundali_engine_lib import ORDER, KP_INDEX, KP_SNAP, KP_STARTS, KP_SUBSUB_SNAP, KP_SUBSUB_STARTS, KP_SUBSUB_LORDS, KP_TOL
+
+ORDER_ARR = np.array(ORDER)   # lord index -> code, e.g. ORDER_ARR[nak_lord]
+
+# Array views of the engine's KP index, so scalar and array lookups share one set of boundaries.
+_KP_STARTS = np.array(KP_STARTS)
+_KP_NAKS = np.array([e.nak for e in KP_INDEX], dtype=np.int64)
+_KP_NAK_LORDS = np.array([ORDER.index(e.nak_lord) for e in KP_INDEX], dtype=np.int64)
+_KP_SUB_LORDS = np.array([ORDER.index(e.sub_lord) for e in KP_INDEX], dtype=np.int64)
+_KP_SUBSUB_STARTS = np.array(KP_SUBSUB_STARTS)
+_KP_SUBSUB_LORDS = np.array([ORDER.index(L) for L in KP_SUBSUB_LORDS], dtype=np.int64)
+_KP_SNAP = np.array(KP_SNAP)
+_KP_SUBSUB_SNAP = np.array(KP_SUBSUB_SNAP)
+
+
+class LonClass(NamedTuple):
+    sign: np.ndarray        # 1..12
+    nav_sign: np.ndarray    # 1..12
+    nak: np.ndarray         # 0..26
+    nak_lord: np.ndarray    # index into ORDER
+    sub_lord: np.ndarray    # index into ORDER
+    sub_sub_lord: np.ndarray  # index into ORDER
+    deg: np.ndarray         # DMS within sign, rounded like fmt_deg_sign()
+    minute: np.ndarray
+    second: np.ndarray
+
+
+def rasi_signs(lons):
+    return (np.floor_divide(lons, 30.0)).astype(np.int64) + 1
+
+def navamsa_signs(lons):
+    lons = np.asarray(lons, dtype=float)
+    sign = rasi_signs(lons); pada = np.floor_divide(lons % 30.0, 30.0 / 9.0).astype(np.int64)
+    return ((sign - 1) * 9 + pada) % 12 + 1
+
+def nakshatras(lons):
+    return _KP_NAKS[_kp_find(_KP_STARTS, _KP_SNAP, lons)]
+
+def _kp_find(starts, snap, lons):
+    """Vector twin of kundali_engine_lib._kp_find (same boundary convention)."""
+    part = np.asarray(lons, dtype=float) % 360.0
+    i = np.searchsorted(starts, part, side='right') - 1
+    return i - (snap[i] & (part - starts[i] <= KP_TOL))
+
+def kp_sublords(lons):
+    """Return (nak_lord, sub_lord) ORDER-index arrays; one searchsorted over the 249-entry KP index."""
+    i = _kp_find(_KP_STARTS, _KP_SNAP, lons)
+    return _KP_NAK_LORDS[i], _KP_SUB_LORDS[i]
+
+def kp_subsublords(lons):
+    return _KP_SUBSUB_LORDS[_kp_find(_KP_SUBSUB_STARTS, _KP_SUBSUB_SNAP, lons)]
+
+def dms_parts(lons):
+    """(deg, minute, second) ints within the sign, with fmt_deg_sign()'s rounding and carries."""
+    x = np.asarray(lons, dtype=float) % 30.0
+    d = np.trunc(x); m_float = (x - d) * 60.0; m = np.trunc(m_float)
+    s = np.round((m_float - m) * 60.0).astype(np.int64)
+    d = d.astype(np.int64); m = m.astype(np.int64)
+    carry = s == 60; s[carry] = 0; m[carry] += 1
+    carry = m == 60; m[carry] = 0; d[carry] += 1
+    d[d == 30] = 0
+    return d, m, s
+
+def classify_longitudes(lons):
+    lons = np.asarray(lons, dtype=float)
+    i = _kp_find(_KP_STARTS, _KP_SNAP, lons)   # nak, nak_lord and sub_lord share one index
+    d, m, s = dms_parts(lons)
+    return LonClass(rasi_signs(lons), navamsa_signs(lons), _KP_NAKS[i], _KP_NAK_LORDS[i], _KP_SUB_LORDS[i],
+                    kp_subsublords(lons), d, m, s)
+
+def fmt_dms(d, m, s):
+    return f"{d:02d}°{m:02d}'{s:02d}\""
@@ -2,11 +2,12 @@
 # Renders a branded login screen and builds Google OAuth URL.
 # Handles missing secrets gracefully (shows a clear message instead of crashing).
 
-import base64, os, time
+import os, time
 from urllib.parse import urlencode
-from pathlib import Path
 import streamlit as st
 
+from asset_helper import image_url
+
 def _read_google_oauth_from_secrets():
     """Return (client_id, redirect_uri); None if missing."""
     try:
@@ -62,15 +63,8 @@ def show_login_screen():
         return
     
   
-    # Background image
-    bg_path = Path("assets/login_bg.png")
-    bg_data_url = ""
-    if bg_path.exists():
-        try:
-            b64 = base64.b64encode(bg_path.read_bytes()).decode("utf-8")
-            bg_data_url = f"data:image/png;base64,{b64}"
-        except Exception:
-            bg_data_url = ""
+    # Background image (optimized once per process; static URL when static serving is on)
+    bg_data_url = image_url("assets/login_bg.png")
 
     st.markdown(f"""
 <link href="https://fonts.googleapis.com/css2?family=Cinzel+Decorative:wght@700&display=swap" rel="stylesheet">
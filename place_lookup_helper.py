@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+# place_lookup_helper.py
+# Place of Birth resolution off the Streamlit script thread. A form submits the typed text and gets a
+# key back at once; a small shared thread pool resolves it with geocode_helper's shared resolver
+# (up to PLACE_SUGGEST_LIMIT matches when Geoapify is asked) while the page keeps rendering.
+# - in-flight dedup: sessions asking for the same normalised text share one job and one result
+# - debounce: a job that needs the network first waits PLACE_DEBOUNCE_S; if every form that asked
+#   has moved on to newer text by then, the request is never sent
+# - results stay in a bounded LRU; network errors expire after PLACE_ERROR_TTL_S so they get retried
+# The match is by construction what cached_geocode() returns for the same text.
+
+import os, threading, time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import NamedTuple, Optional
+
+from gazetteer_helper import get_gazetteer
+from geocode_helper import PLACE_NOT_FOUND, cached_geocode_candidates, normalize_place
+from timezone_helper import get_timezone_finder, tzname_at
+
+PLACE_LOOKUP_WORKERS = int(os.getenv("KUNDALI_PLACE_LOOKUP_WORKERS", "2"))
+PLACE_SUGGEST_LIMIT = 5
+PLACE_DEBOUNCE_S = 0.4
+PLACE_ERROR_TTL_S = 30
+PLACE_RESULTS_SIZE = 1024
+
+
+class PlaceCandidate(NamedTuple):
+    lat: float
+    lon: float
+    formatted: str
+    tzname: Optional[str]       # IANA zone at lat / lon (tzname_at), None over open sea
+
+
+class PlaceLookupResult(NamedTuple):
+    match: Optional[PlaceCandidate]   # what cached_geocode(text) resolves to; None if it would fail
+    candidates: tuple                 # suggestions, best first (match first when there is one)
+    error: Optional[str]              # why there is no match
+    at: float                         # time.time() it was resolved
+
+    @property
+    def expired(self):
+        return (self.match is None and self.error not in (None, PLACE_NOT_FOUND)
+                and time.time() - self.at > PLACE_ERROR_TTL_S)
+
+
+class ResolvedPlace(NamedTuple):
+    """Per-session record of the place the form resolved, shared by the UTC auto-fill and Generate.
+    Valid while the Place of Birth text equals `text`; tz_hours is the offset at dt_local."""
+    text: str
+    lat: float
+    lon: float
+    formatted: str
+    tzname: Optional[str]
+    tz_hours: Optional[float] = None
+    dt_local: Optional[object] = None    # naive local datetime tz_hours was computed for
+
+    @classmethod
+    def from_match(cls, text, match):
+        return cls(text, match.lat, match.lon, match.formatted, match.tzname)
+
+
+def _candidate(lat, lon, formatted):
+    return PlaceCandidate(float(lat), float(lon), formatted, tzname_at(lat, lon))
+
+class _Superseded(Exception):
+    pass
+
+def resolve_place(place, api_key, limit=PLACE_SUGGEST_LIMIT, wanted=None):
+    """PlaceLookupResult for the text (blocking): the match from cached_geocode_candidates() plus
+    gazetteer suggestions. wanted() is asked after the debounce, before any network request;
+    returning False abandons the lookup (result None)."""
+    gaz = get_gazetteer()
+    local = [] if gaz is None else [_candidate(p.lat, p.lon, p.formatted) for p in gaz.suggest(place, limit)]
+
+    def before_network():
+        if wanted is not None:
+            time.sleep(PLACE_DEBOUNCE_S)
+            if not wanted():
+                raise _Superseded()
+    try:
+        found = cached_geocode_candidates(place, api_key, limit, before_network)
+    except _Superseded:
+        return None
+    except RuntimeError as e:
+        return PlaceLookupResult(None, tuple(local), str(e), time.time())
+    matches = [_candidate(*f) for f in found]
+    names = {m.formatted for m in matches}
+    candidates = matches + [c for c in local if c.formatted not in names]
+    return PlaceLookupResult(matches[0], tuple(candidates[:limit]), None, time.time())
+
+
+def _warm_up():
+    try:
+        get_gazetteer(); get_timezone_finder()
+    except Exception:
+        pass
+
+
+class PlaceLookup:
+    """Background resolver shared by all sessions. request() never blocks; poll() / wait() read the result."""
+
+    def __init__(self, workers=PLACE_LOOKUP_WORKERS, maxsize=PLACE_RESULTS_SIZE):
+        self.maxsize = maxsize
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="place-lookup")
+        self._lock = threading.Lock()
+        self._inflight = {}            # key -> Future
+        self._waiting = {}             # key -> number of forms whose current text it is
+        self._results = OrderedDict()  # key -> PlaceLookupResult
+        self._pool.submit(_warm_up)    # load gazetteer + zone polygons before the first form needs them
+
+    def request(self, place, api_key, previous=None):
+        """Start resolving the text unless it is cached or already running; returns its key.
+        previous is the key this form asked for last (from an earlier rerun), which it no longer wants."""
+        key = normalize_place(place)
+        with self._lock:
+            if previous is not None and previous != key:
+                n = self._waiting.get(previous, 0) - 1
+                if n > 0:
+                    self._waiting[previous] = n
+                else:
+                    self._waiting.pop(previous, None)
+            res = self._results.get(key)
+            if res is not None and not res.expired:
+                self._results.move_to_end(key)
+                return key
+            if previous != key:
+                self._waiting[key] = self._waiting.get(key, 0) + 1
+            if key not in self._inflight:
+                self._results.pop(key, None)
+                self._waiting.setdefault(key, 1)   # same form re-asking after its job was dropped / expired
+                self._inflight[key] = self._pool.submit(self._run, key, place, api_key)
+        return key
+
+    def _wanted(self, key):
+        with self._lock:
+            return self._waiting.get(key, 0) > 0
+
+    def _run(self, key, place, api_key):
+        try:
+            res = resolve_place(place, api_key, wanted=lambda: self._wanted(key))
+        except Exception as e:
+            res = PlaceLookupResult(None, (), str(e), time.time())
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._waiting.pop(key, None)
+            if res is not None:
+                self._results[key] = res
+                while len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+        return res
+
+    def poll(self, key):
+        """PlaceLookupResult, or None while the lookup is pending (or was dropped by the debounce)."""
+        with self._lock:
+            return self._results.get(key)
+
+    def pending(self, key):
+        with self._lock:
+            return key in self._inflight
+
+    def wait(self, key, timeout):
+        """poll() after giving a running lookup up to `timeout` seconds (gazetteer hits take well under 1 ms)."""
+        with self._lock:
+            fut = self._inflight.get(key)
+        if fut is not None:
+            try:
+                fut.result(timeout)
+            except FutureTimeout:
+                pass
+        return self.poll(key)
+
+
+_default_lookup = None
+_default_lock = threading.Lock()
+
+def get_place_lookup():
+    global _default_lookup
+    with _default_lock:
+        if _default_lookup is None:
+            _default_lookup = PlaceLookup()
+        return _default_lookup
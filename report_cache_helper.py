@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# report_cache_helper.py
+# Content-addressed cache of finished reports (DOCX / PDF bytes + chart SVGs), shared by all sessions.
+# The key is a SHA-256 of everything that ends up in the files: name, place, lat / lon, the UTC and
+# local birth time, the timezone, REPORT_LAYOUT_VERSION and the UTC date the report is "as of"
+# (the antardasha rows, Sade Sati and Muntha depend on today). Two tiers, like the geocode cache:
+# an in-process LRU bounded by bytes, and an optional directory of pickles (REPORT_CACHE_DIR).
+
+import hashlib, json, os, pickle, tempfile, threading, datetime
+from collections import OrderedDict
+
+REPORT_LAYOUT_VERSION = 1       # bump whenever report tables or DOCX / PDF / SVG layout change
+REPORT_CACHE_MAX_BYTES = int(os.getenv("KUNDALI_REPORT_CACHE_MB", "64")) * 1024 * 1024
+REPORT_CACHE_DIR = os.getenv("KUNDALI_REPORT_CACHE_DIR", "")   # "" = memory only
+
+
+def report_fingerprint(name, place, lat, lon, dt_local, dt_utc, tzname, tz_hours, as_of=None, **extra):
+    """Hex key for one report; as_of (a date, default today UTC) rolls the key over daily."""
+    as_of = as_of or datetime.datetime.now(datetime.timezone.utc).date()
+    payload = {
+        "v": REPORT_LAYOUT_VERSION, "name": name, "place": place,
+        "lat": round(float(lat), 6), "lon": round(float(lon), 6),
+        "local": dt_local.isoformat(), "utc": dt_utc.isoformat(),
+        "tz": tzname, "tz_hours": round(float(tz_hours), 4), "as_of": as_of.isoformat(),
+        **{k: extra[k] for k in sorted(extra)},
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """LRU of key -> value (any picklable bundle), optionally backed by one pickle file per key."""
+
+    def __init__(self, max_bytes=REPORT_CACHE_MAX_BYTES, cache_dir=REPORT_CACHE_DIR):
+        self.max_bytes = max_bytes
+        self._lru = OrderedDict()   # key -> (size, value)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._dir = None
+        if cache_dir:
+            try:
+                os.makedirs(cache_dir, exist_ok=True)
+                self._dir = cache_dir
+            except Exception:
+                self._dir = None   # disk tier is optional; keep working from memory
+
+    def _path(self, key):
+        return os.path.join(self._dir, key[:2], key + ".pkl")
+
+    def _remember(self, key, size, value):
+        old = self._lru.pop(key, None)
+        if old is not None:
+            self._bytes -= old[0]
+        self._lru[key] = (size, value); self._bytes += size
+        while self._bytes > self.max_bytes and len(self._lru) > 1:
+            _, (s, _) = self._lru.popitem(last=False); self._bytes -= s
+
+    def get(self, key):
+        """Cached value or None."""
+        with self._lock:
+            item = self._lru.get(key)
+            if item is not None:
+                self._lru.move_to_end(key); return item[1]
+        if self._dir is None:
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            value = pickle.loads(data)
+        except Exception:
+            return None
+        with self._lock:
+            self._remember(key, len(data), value)
+        return value
+
+    def put(self, key, value):
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._remember(key, len(data), value)
+        if self._dir is None:
+            return
+        try:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except Exception:
+            pass
+
+    def get_or_build(self, key, build):
+        """Cached value for key, else build() stored under it. Returns (value, hit)."""
+        value = self.get(key)
+        if value is not None:
+            return value, True
+        value = build()
+        self.put(key, value)
+        return value, False
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def get_report_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ReportCache()
+        return _default_cache
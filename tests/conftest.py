@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+# tests/conftest.py
+# The app's modules live at the repository root; make them importable from tests/.
+
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,20 @@
+import numpy as np
+
+from kundali_dasha_lib import DashaTree
+
+BIRTH_JD, MOON = 2447000.5, 123.4
+
+
+def test_shallow_tree_stops_at_its_own_depth():
+    tree = DashaTree(BIRTH_JD, MOON, levels=3)
+    path = tree.active_path(2455000.0)
+    assert [n.level for n in path] == [1, 2, 3]
+    assert path[-1].children == ()
+
+
+def test_any_real_jd_is_accepted():
+    tree = DashaTree(BIRTH_JD, MOON)
+    ref = tree.active_path(2455000.0)
+    assert tree.active_path(2455000) == ref
+    assert tree.active_path(np.float64(2455000.0)) == ref
+    assert tree.periods(2, 2455000, np.float64(2455100.0)) == tree.periods(2, 2455000.0, 2455100.0)
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# tests/test_gazetteer.py
+# The offline gazetteer must miss (and let Geoapify answer) rather than return a same-named city
+# elsewhere: a wrong lat / lon / zone silently corrupts the whole chart.
+
+import pytest
+
+from gazetteer_helper import get_gazetteer
+
+gaz = get_gazetteer()
+pytestmark = pytest.mark.skipif(gaz is None, reason="assets/gazetteer.tsv.gz missing")
+
+
+@pytest.mark.parametrize("text", [
+    "Portland, Maine",        # was Portland, Oregon
+    "Newark, Delaware",       # was Newark, New Jersey
+    "Richmond, London",       # was Richmond, Virginia
+    "Victoria, BC",           # was Victoria, Hong Kong
+    "Windsor, Berkshire",     # was Windsor, Ontario
+    "Edinburg",               # typo-only hit, was Edinburgh
+])
+def test_unverifiable_or_fuzzy_is_a_miss(text):
+    assert gaz.lookup_place(text) is None
+
+
+@pytest.mark.parametrize("text, formatted", [
+    ("Mumbai, Maharashtra, India", "Mumbai, Maharashtra, India"),
+    ("Bombay", "Mumbai, Maharashtra, India"),
+    ("Kolkata, WB", "Kolkata, West Bengal, India"),
+    ("Portland, Oregon", "Portland, Oregon, United States"),
+    ("Springfield, Illinois, USA", "Springfield, Illinois, United States"),
+])
+def test_exact_with_known_qualifiers(text, formatted):
+    assert gaz.lookup_place(text).formatted == formatted
+
+
+def test_fuzzy_only_in_suggestions():
+    assert "Edinburgh, Scotland, United Kingdom" in [p.formatted for p in gaz.suggest("Edinburg")]
+
+
+def test_cached_geocode_defers_to_geoapify():
+    from geocode_helper import cached_geocode
+    with pytest.raises(RuntimeError, match="Geoapify key missing"):
+        cached_geocode("Portland, Maine", "")
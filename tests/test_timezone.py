@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# tests/test_timezone.py
+# Offsets from the flattened transition tables must agree with pytz localize(is_dst=False),
+# including wall times that are skipped (spring forward) or repeated (fall back).
+
+import datetime
+
+import pytest
+import pytz
+
+from timezone_helper import local_to_utc, utc_offset_hours, utc_offsets_hours, zone_transitions
+
+
+def _pytz_hours(tzname, dt):
+    return pytz.timezone(tzname).localize(dt, is_dst=False).utcoffset().total_seconds() / 3600.0
+
+
+@pytest.mark.parametrize("tzname, dt, expected", [
+    ("America/New_York", datetime.datetime(2021, 3, 14, 2, 30), -5.0),   # skipped: 02:00 -> 03:00
+    ("America/New_York", datetime.datetime(2021, 11, 7, 1, 30), -5.0),   # repeated 01:00-02:00
+    ("Europe/London", datetime.datetime(2021, 3, 28, 1, 30), 0.0),       # skipped
+    ("Europe/London", datetime.datetime(2021, 10, 31, 1, 30), 0.0),      # repeated
+    ("Australia/Sydney", datetime.datetime(2021, 10, 3, 2, 30), 10.0),   # skipped (southern spring)
+    ("Australia/Sydney", datetime.datetime(2021, 4, 4, 2, 30), 10.0),    # repeated
+    ("Asia/Kolkata", datetime.datetime(1943, 6, 1, 12, 0), 6.5),         # war time
+])
+def test_gap_and_overlap_match_pytz(tzname, dt, expected):
+    assert utc_offset_hours(tzname, dt) == expected == _pytz_hours(tzname, dt)
+    assert utc_offsets_hours(tzname, [dt])[0] == expected
+    assert local_to_utc(tzname, dt) == (expected, dt - datetime.timedelta(hours=expected))
+
+
+@pytest.mark.parametrize("tzname", ["America/New_York", "Europe/London", "Australia/Sydney", "Asia/Kolkata"])
+def test_every_transition_matches_pytz(tzname):
+    # probe the middle of each gap / overlap, and just either side of it
+    tz = pytz.timezone(tzname); tr = zone_transitions(tzname)
+    for t, new, old in zip(tz._utc_transition_times[1:], tr.offsets[1:], tr.offsets[:-1]):
+        if not 1900 <= t.year <= 2100:
+            continue
+        lo, hi = sorted((old, new))
+        for s in (lo - 60, (lo + hi) / 2, hi + 60):
+            dt = t + datetime.timedelta(seconds=s)
+            assert utc_offset_hours(tzname, dt) == _pytz_hours(tzname, dt), dt
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# timezone_helper.py
+# One shared TimezoneFinder per process (its polygon data is loaded once, lazily) and a
+# memoised lat/lon -> IANA zone name lookup on a ~11 m grid, so repeat lookups are a dict hit.
+# Offsets come from each zone's full pytz transition history (DST, India's 1942-45 war time,
+# LMT before standard time), flattened once per zone into arrays and looked up by bisect.
+
+import bisect, datetime, os, threading
+from functools import lru_cache
+from typing import NamedTuple
+
+import numpy as np
+import pytz
+from timezonefinder import TimezoneFinder
+
+TZ_IN_MEMORY = os.getenv("TZ_FINDER_IN_MEMORY", "1") != "0"   # read polygon data into RAM, not per-query file reads
+TZ_QUANT = 1e-4          # degrees; ~11 m, far below any zone boundary precision that matters for a birth place
+TZ_CACHE_SIZE = 8192
+
+_finder = None
+_finder_lock = threading.Lock()
+
+def get_timezone_finder():
+    global _finder
+    with _finder_lock:
+        if _finder is None:
+            _finder = TimezoneFinder(in_memory=TZ_IN_MEMORY)
+        return _finder
+
+
+@lru_cache(maxsize=TZ_CACHE_SIZE)
+def _tzname_at_q(qlat, qlon):
+    return get_timezone_finder().timezone_at(lat=qlat * TZ_QUANT, lng=qlon * TZ_QUANT)
+
+def tzname_at(lat, lon):
+    """IANA zone name for a point, or None over open sea / unknown."""
+    return _tzname_at_q(round(float(lat) / TZ_QUANT), round(float(lon) / TZ_QUANT))
+
+
+# ---- UTC offsets ----
+_EPOCH = datetime.datetime(1970, 1, 1)
+
+class TzTransitions(NamedTuple):
+    """Offset intervals of one zone. Interval i starts at local_starts[i] (local wall-clock seconds
+    since 1970) and has offsets[i] seconds east of UTC."""
+    local_starts: list
+    offsets: list
+    local_starts_arr: np.ndarray
+    offsets_arr: np.ndarray
+
+def _secs(dt):
+    return (dt - _EPOCH).total_seconds()
+
+@lru_cache(maxsize=512)
+def zone_transitions(tzname):
+    tz = pytz.timezone(tzname)
+    utc_times = getattr(tz, "_utc_transition_times", None)
+    if utc_times:
+        offsets = [info[0].total_seconds() for info in tz._transition_info]
+        starts = [-np.inf] + [_secs(t) + off for t, off in zip(utc_times[1:], offsets[1:])]
+    else:
+        # fixed-offset zones (UTC, Etc/GMT+5, ...)
+        offsets = [tz.utcoffset(datetime.datetime(2000, 1, 1)).total_seconds()]
+        starts = [-np.inf]
+    return TzTransitions(starts, offsets, np.array(starts), np.array(offsets))
+
+def utc_offset_hours(tzname, dt_local):
+    """Offset (hours east of UTC) in force at the naive local wall-clock time dt_local.
+    A repeated wall time (clocks set back) takes the later interval's offset; a skipped one (clocks
+    set forward) the earlier interval's, i.e. the offset before the jump. For ordinary DST both mean
+    standard time, the same answer as pytz localize(is_dst=False)."""
+    tr = zone_transitions(tzname)
+    i = bisect.bisect_right(tr.local_starts, _secs(dt_local.replace(tzinfo=None))) - 1
+    return tr.offsets[max(i, 0)] / 3600.0
+
+def utc_offsets_hours(tzname, dts_local):
+    """Vectorised utc_offset_hours for an array of naive datetimes / datetime64 values."""
+    tr = zone_transitions(tzname)
+    x = (np.asarray(dts_local, dtype="datetime64[us]") - np.datetime64("1970-01-01T00:00:00", "us")) / np.timedelta64(1, "s")
+    i = np.searchsorted(tr.local_starts_arr, x, side="right") - 1
+    return tr.offsets_arr[np.maximum(i, 0)] / 3600.0
+
+def local_to_utc(tzname, dt_local):
+    """(offset_hours, naive UTC datetime) for a naive local datetime in tzname."""
+    off = utc_offset_hours(tzname, dt_local)
+    return off, dt_local.replace(tzinfo=None) - datetime.timedelta(hours=off)
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+# transit_index_lib.py
+# Prebuilt index of every sign ingress, nakshatra ingress and retrograde / direct station of the nine
+# grahas over 1800-2100 (the app's date range), so transit questions are a binary search instead of
+# a day-by-day ephemeris scan: "when does Jupiter next enter my 7th house", "which nakshatra is the
+# Moon in", "when does Mercury station".
+# Built offline from swe.calc_ut: a 4-day scan (shorter than any retrograde loop), stations by bisection
+# on speed, then each monotonic stretch is searched for 30 deg / 13 deg 20' boundaries with
+# speed-guided (Newton) steps that fall back to bisection. Times are kept to the minute.
+# ~210k events, stored as int32 minutes + int8 values in a compressed .npz (~0.7 MB, ~75 s to build):
+#   python transit_index_lib.py build [1800 2100]
+#   python transit_index_lib.py check
+
+import argparse, datetime, json, os, threading
+from typing import NamedTuple
+
+import numpy as np
+import swisseph as swe
+
+from kundali_engine_lib import PLANETS, SWE_BODIES, NAK_SPAN, set_sidereal_locked
+
+TRANSIT_INDEX_PATH = os.getenv(
+    "KUNDALI_TRANSIT_INDEX",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "transit_index.npz"))
+INDEX_VERSION = 1
+
+SIGN, NAKSHATRA, STATION_R, STATION_D = range(4)   # event kinds
+KIND_NAMES = ("sign", "nakshatra", "station_r", "station_d")
+KIND_SPAN = {SIGN: 30.0, NAKSHATRA: NAK_SPAN}
+SCAN_DAYS = 4.0                   # Mercury's ~3-week retrograde is the shortest loop
+ROOT_TOL_DAYS = 1.0 / 86400       # ingress root to a second (stored to the minute)
+STATION_TOL_DAYS = 1.0 / 1440
+
+
+class TransitEvent(NamedTuple):
+    dt_utc: datetime.datetime      # naive UTC, to the minute
+    planet: str                    # PLANETS code
+    kind: int                      # SIGN / NAKSHATRA / STATION_R / STATION_D
+    value: int                     # sign 1..12 or nakshatra 1..27 entered; sign of the station
+
+
+def _datetime(jd):
+    y, m, d, h = swe.revjul(jd)
+    return datetime.datetime(y, m, d) + datetime.timedelta(minutes=round(h * 60))
+
+def _jd(dt_utc):
+    if dt_utc.tzinfo is not None:
+        dt_utc = dt_utc.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return swe.julday(dt_utc.year, dt_utc.month, dt_utc.day,
+                      dt_utc.hour + dt_utc.minute/60 + dt_utc.second/3600 + dt_utc.microsecond/3.6e9)
+
+
+class TransitIndex:
+    """Events per (planet, kind), time ordered; minute[k] counts minutes from jd0."""
+
+    def __init__(self, path=TRANSIT_INDEX_PATH):
+        with np.load(path) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta.get("version") != INDEX_VERSION or meta.get("sid_mode") != swe.SIDM_LAHIRI:
+                raise ValueError(f"incompatible transit index {path}")
+            self.minute, self.value = z["minute"], z["value"]
+            self.offsets, self.start = z["offsets"], z["start"]
+        self.jd0, self.jd1 = float(meta["jd0"]), float(meta["jd1"])
+        self._by_value = {}
+
+    def _group(self, code, kind):
+        g = PLANETS.index(code) * 4 + kind
+        a, b = int(self.offsets[g]), int(self.offsets[g + 1])
+        return self.minute[a:b], self.value[a:b]
+
+    def _minute(self, dt_utc):
+        return (_jd(dt_utc) - self.jd0) * 1440.0
+
+    def covers(self, dt_utc):
+        return self.jd0 <= _jd(dt_utc) < self.jd1
+
+    def events(self, code, kind, start_utc=None, end_utc=None):
+        """TransitEvents of one planet and kind in [start_utc, end_utc)."""
+        minute, value = self._group(code, kind)
+        a = 0 if start_utc is None else int(np.searchsorted(minute, self._minute(start_utc)))
+        b = len(minute) if end_utc is None else int(np.searchsorted(minute, self._minute(end_utc)))
+        return [TransitEvent(_datetime(self.jd0 + m / 1440.0), code, kind, v)
+                for m, v in zip(minute[a:b].tolist(), value[a:b].tolist())]
+
+    def state_at(self, code, dt_utc, kind=SIGN):
+        """Sign (1..12) or nakshatra (1..27) the planet is in at dt_utc."""
+        minute, value = self._group(code, kind)
+        k = int(np.searchsorted(minute, self._minute(dt_utc), side="right")) - 1
+        return int(value[k]) if k >= 0 else int(self.start[PLANETS.index(code), kind])
+
+    def next_entry(self, code, value, after_utc, kind=SIGN):
+        """First time after after_utc the planet enters sign / nakshatra `value`; None past the index."""
+        key = (code, kind, value)
+        if key not in self._by_value:
+            minute, values = self._group(code, kind)
+            self._by_value[key] = minute[values == value]
+        minute = self._by_value[key]
+        k = int(np.searchsorted(minute, self._minute(after_utc), side="right"))
+        return _datetime(self.jd0 + minute[k] / 1440.0) if k < len(minute) else None
+
+    def next_house_entry(self, code, house, lagna_sign, after_utc):
+        """When `code` next enters `house` (1..12, whole-sign from lagna_sign)."""
+        return self.next_entry(code, (lagna_sign + house - 2) % 12 + 1, after_utc)
+
+    def segments(self, code, kind=SIGN):
+        """(jds, values): in values[k] from jds[k] to jds[k + 1]; jds[0] / jds[-1] are the index limits."""
+        minute, value = self._group(code, kind)
+        jds = np.concatenate(([self.jd0], self.jd0 + minute / 1440.0, [self.jd1]))
+        return jds, np.concatenate(([self.start[PLANETS.index(code), kind]], value)).astype(np.int8)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+def get_transit_index():
+    """Shared index, loaded on first use; None if it hasn't been built."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            try:
+                _index = TransitIndex()
+            except Exception:
+                _index = False
+        return _index or None
+
+
+# ---- Offline builder ----
+def _body_calc(code):
+    """jd -> (sidereal longitude, speed) for one graha (Ke = Ra + 180)."""
+    body = SWE_BODIES[PLANETS.index('Ra') if code == 'Ke' else PLANETS.index(code)]
+    shift = 180.0 if code == 'Ke' else 0.0
+    flags = swe.FLG_SWIEPH | swe.FLG_SPEED | swe.FLG_SIDEREAL
+    calc_ut = swe.calc_ut
+    def calc(jd):
+        xx, _ = calc_ut(jd, body, flags)
+        return (xx[0] + shift) % 360.0, xx[3]
+    return calc
+
+def _bisect_station(calc, a, b):
+    """Speed changes sign once in [a, b]."""
+    sa = calc(a)[1] > 0
+    while b - a > STATION_TOL_DAYS:
+        mid = 0.5 * (a + b)
+        if (calc(mid)[1] > 0) == sa:
+            a = mid
+        else:
+            b = mid
+    return 0.5 * (a + b)
+
+def _crossing(calc, a, b, target):
+    """t in [a, b] where the longitude passes `target`; motion is monotonic over [a, b]."""
+    fa = (calc(a)[0] - target + 180.0) % 360.0 - 180.0
+    t = a + (b - a) * 0.5
+    for _ in range(60):
+        lon, speed = calc(t)
+        f = (lon - target + 180.0) % 360.0 - 180.0
+        if (f < 0) == (fa < 0):
+            a = t
+        else:
+            b = t
+        step = f / speed if speed else 0.0
+        nt = t - step
+        if not speed or not a <= nt <= b:
+            nt = 0.5 * (a + b)                # Newton left the bracket (near a station): bisect
+        if abs(nt - t) < ROOT_TOL_DAYS or b - a < ROOT_TOL_DAYS:
+            return nt
+        t = nt
+    return t
+
+def _planet_events(code, jd0, jd1):
+    """{kind: [(jd, value)]} for one graha, plus its (sign, nakshatra) at jd0."""
+    calc = _body_calc(code)
+    grid = np.arange(jd0, jd1 + SCAN_DAYS, SCAN_DAYS)
+    samples = [(jd,) + calc(jd) for jd in grid.tolist()]
+    events = {SIGN: [], NAKSHATRA: [], STATION_R: [], STATION_D: []}
+
+    # stations split the scan into monotonic stretches
+    points = [samples[0]]
+    for p, q in zip(samples, samples[1:]):
+        if (p[2] > 0) != (q[2] > 0):
+            t = _bisect_station(calc, p[0], q[0])
+            lon, _ = calc(t)
+            kind = STATION_R if p[2] > 0 else STATION_D
+            events[kind].append((t, int(lon // 30) + 1))
+            points.append((t, lon, 0.0))
+        points.append(q)
+
+    for p, q in zip(points, points[1:]):
+        u0 = p[1]
+        u1 = u0 + (q[1] - p[1] + 180.0) % 360.0 - 180.0     # unwrapped; < 180 deg per step
+        direct = u1 >= u0
+        for kind, span in KIND_SPAN.items():
+            n = int(round(360.0 / span))
+            lo, hi = sorted((u0, u1))
+            for k in range(int(np.floor(lo / span)) + 1, int(np.floor(hi / span)) + 1):
+                t = _crossing(calc, p[0], q[0], (k * span) % 360.0)
+                entered = k if direct else k - 1
+                if jd0 <= t < jd1:
+                    events[kind].append((t, entered % n + 1))
+    start = (int(samples[0][1] // 30) + 1, int(samples[0][1] // NAK_SPAN) + 1)
+    return events, start
+
+def build_transit_index(start_year=1800, end_year=2100, path=TRANSIT_INDEX_PATH):
+    """Scan [1 Jan start_year, 1 Jan end_year + 1] and write the compressed index. Returns event count."""
+    set_sidereal_locked()
+    jd0 = swe.julday(start_year, 1, 1, 0.0)
+    jd1 = swe.julday(end_year + 1, 1, 1, 0.0)
+    minutes, values, offsets, starts = [], [], [0], []
+    for code in PLANETS:
+        events, start = _planet_events(code, jd0, jd1)
+        starts.append(start + (0, 0))
+        for kind in range(4):
+            ev = sorted(events[kind])
+            minutes.append(np.array([round((t - jd0) * 1440.0) for t, _ in ev], dtype=np.int32))
+            values.append(np.array([v for _, v in ev], dtype=np.int8))
+            offsets.append(offsets[-1] + len(ev))
+    meta = {"version": INDEX_VERSION, "sid_mode": swe.SIDM_LAHIRI, "jd0": jd0, "jd1": jd1,
+            "start_year": start_year, "end_year": end_year, "kinds": KIND_NAMES}
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez_compressed(tmp, meta=np.array(json.dumps(meta)), minute=np.concatenate(minutes),
+                        value=np.concatenate(values), offsets=np.array(offsets, dtype=np.int64),
+                        start=np.array(starts, dtype=np.int8))
+    os.replace(tmp, path)
+    return offsets[-1]
+
+def check_transit_index(index, samples=20000, seed=0):
+    """{code: mismatches} of state_at() against calc_ut at random instants, skipping instants within
+    a minute of an event (the stored rounding)."""
+    rng = np.random.default_rng(seed)
+    jds = index.jd0 + rng.random(samples) * (index.jd1 - index.jd0)
+    set_sidereal_locked()
+    out = {}
+    for code in PLANETS:
+        calc = _body_calc(code); bad = 0
+        for kind, span in KIND_SPAN.items():
+            minute, value = index._group(code, kind)
+            m = (jds - index.jd0) * 1440.0
+            k = np.searchsorted(minute, m, side="right")
+            near = np.minimum(np.abs(m - minute[np.clip(k - 1, 0, len(minute) - 1)]),
+                              np.abs(m - minute[np.clip(k, 0, len(minute) - 1)])) <= 1.0
+            for jd, kk, skip in zip(jds.tolist(), k.tolist(), near.tolist()):
+                if skip:
+                    continue
+                got = int(value[kk - 1]) if kk > 0 else int(index.start[PLANETS.index(code), kind])
+                bad += got != int(calc(jd)[0] // span) + 1
+        out[code] = bad
+    return out
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Build or check the ingress / station index.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build")
+    b.add_argument("start_year", type=int, nargs="?", default=1800)
+    b.add_argument("end_year", type=int, nargs="?", default=2100)
+    b.add_argument("--out", default=TRANSIT_INDEX_PATH)
+    c = sub.add_parser("check")
+    c.add_argument("--path", default=TRANSIT_INDEX_PATH)
+    c.add_argument("--samples", type=int, default=20000)
+    args = ap.parse_args()
+    if args.cmd == "build":
+        print(build_transit_index(args.start_year, args.end_year, args.out), "events written to", args.out)
+    else:
+        for code, bad in check_transit_index(TransitIndex(args.path), args.samples).items():
+            print(f"{code}  {bad} mismatches")